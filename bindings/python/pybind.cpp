@@ -36,15 +36,49 @@
 
 using namespace yolov5;
 
-inline cv::Mat arrayToMat(const pybind11::array_t<uint8_t, 
-                            pybind11::array::c_style | 
-                            pybind11::array::forcecast>& img)
+/*  
+    Wrap a numpy array (rows x columns x channels) as a cv::Mat, without
+    copying the pixel data. This is possible whenever the pixels within each
+    row are contiguous, which includes views of a larger image (e.g. crops):
+    the step of the cv::Mat is taken from the array. The cv::Mat refers to
+    the memory of the array, so the array should outlive it.
+
+    If the rows are not contiguous (e.g. for a view with the channels 
+    reversed) and 'copy' is specified, a C-contiguous copy is made and stored
+    in 'copy', which should then outlive the cv::Mat instead. Otherwise, or if
+    the array is not an image, an empty cv::Mat is returned.
+*/
+inline cv::Mat arrayToMat(const pybind11::array_t<uint8_t>& img,
+                            pybind11::object* copy = nullptr)
 {
+    if(img.ndim() != 3 || img.shape(2) < 1 || img.shape(2) > CV_CN_MAX)
+    {
+        return cv::Mat();
+    }
     const auto rows = img.shape(0);
     const auto columns = img.shape(1);
     const auto channels = img.shape(2);
+
+    if(img.strides(2) != 1 || img.strides(1) != channels || 
+        img.strides(0) < columns * channels)
+    {
+        if(!copy)
+        {
+            return cv::Mat();
+        }
+        const auto contiguous = pybind11::array_t<uint8_t, 
+                                    pybind11::array::c_style | 
+                                    pybind11::array::forcecast>::ensure(img);
+        if(!contiguous)
+        {
+            return cv::Mat();
+        }
+        *copy = contiguous;
+        return cv::Mat(rows, columns, CV_8UC(channels), 
+                        (unsigned char*)contiguous.data());
+    }
     return cv::Mat(rows, columns, CV_8UC(channels), 
-                    (unsigned char*)img.data());
+                    (unsigned char*)img.data(), (size_t)img.strides(0));
 }
 
 PYBIND11_MODULE(yolov5tensorrt, m) 
@@ -76,7 +110,8 @@ PYBIND11_MODULE(yolov5tensorrt, m)
 
     pybind11::enum_<Precision>(m, "Precision")
         .value("FP32", PRECISION_FP32)
-        .value("FP16", PRECISION_FP16);
+        .value("FP16", PRECISION_FP16)
+        .value("INT8", PRECISION_INT8);
     m.def("precision_to_string", 
         pybind11::overload_cast<Precision>(&precision_to_string),
         "Get a textual description of a precision code");
@@ -85,7 +120,9 @@ PYBIND11_MODULE(yolov5tensorrt, m)
         .value("INPUT_BGR", INPUT_BGR)
         .value("INPUT_RGB", INPUT_RGB)
         .value("PREPROCESSOR_CVCUDA", PREPROCESSOR_CVCUDA)
-        .value("PREPROCESSOR_CVCPU", PREPROCESSOR_CVCPU);
+        .value("PREPROCESSOR_CVCPU", PREPROCESSOR_CVCPU)
+        .value("PREPROCESSOR_CUDA", PREPROCESSOR_CUDA)
+        .value("USE_CUDA_GRAPH", USE_CUDA_GRAPH);
 
 
     /*
@@ -97,13 +134,61 @@ PYBIND11_MODULE(yolov5tensorrt, m)
         .def("buildEngine",
             [](const Builder& builder, 
                 const std::string& inputPath, const std::string& outputPath,
-                Precision precision)
+                Precision precision, const std::string& calibrationDirectory,
+                const std::string& calibrationCacheFile)
             {
-                return builder.buildEngine(inputPath, outputPath, precision);
+                return builder.buildEngine(inputPath, outputPath, precision,
+                                calibrationDirectory, calibrationCacheFile);
             },
             pybind11::arg("inputPath"), pybind11::arg("outputPath"), 
             pybind11::arg("precision") = PRECISION_FP32,
+            pybind11::arg("calibrationDirectory") = "",
+            pybind11::arg("calibrationCacheFile") = "",
             "Build an engine from ONNX model input, save it to disk"
+        )
+        .def("setOptimizationProfile",
+            [](Builder& builder, const std::tuple<int, int, int>& minShape,
+                const std::tuple<int, int, int>& optShape,
+                const std::tuple<int, int, int>& maxShape)
+            {
+                /*  (batch size, rows, columns) -> NCHW  */
+                const auto toDims = [](const std::tuple<int, int, int>& t)
+                {
+                    return nvinfer1::Dims4(std::get<0>(t), 3, 
+                                            std::get<1>(t), std::get<2>(t));
+                };
+                return builder.setOptimizationProfile(toDims(minShape),
+                                    toDims(optShape), toDims(maxShape));
+            },
+            pybind11::arg("minShape"), pybind11::arg("optShape"),
+            pybind11::arg("maxShape"),
+            "Set the optimization profile for models with dynamic input "
+                "dimensions. Shapes are specified as (batch size, rows, "
+                "columns)"
+        )
+        .def("setDLACore", &Builder::setDLACore,
+            pybind11::arg("dlaCore"), 
+            pybind11::arg("allowGpuFallback") = false,
+            "Offload the engine to a Deep Learning Accelerator (DLA) core. "
+                "Specify -1 to disable"
+        )
+        .def("inputDimensions",
+            [](const Builder& builder, const std::string& inputPath)
+            {
+                nvinfer1::Dims dims;
+                dims.nbDims = 0;
+                const Result r = builder.inputDimensions(inputPath, &dims);
+
+                pybind11::list out;
+                for(int i = 0; i < dims.nbDims; ++i)
+                {
+                    out.append(dims.d[i]);
+                }
+                return pybind11::make_tuple(r, pybind11::tuple(out));
+            },
+            pybind11::arg("inputPath"),
+            "Retrieve the input dimensions (NCHW) of an ONNX model. Dynamic "
+                "dimensions are reported as -1"
         );
 
 
@@ -112,6 +197,22 @@ PYBIND11_MODULE(yolov5tensorrt, m)
     */
     pybind11::class_<Detection>(m, "Detection")
         .def(pybind11::init<>())
+        .def(pybind11::init(
+            [](const int& classId, 
+                const std::tuple<int, int, int, int>& boundingBox,
+                const double& score)
+            {
+                const cv::Rect r(std::get<0>(boundingBox), 
+                                std::get<1>(boundingBox), 
+                                std::get<2>(boundingBox), 
+                                std::get<3>(boundingBox));
+                return Detection(classId, r, score);
+            }),
+            pybind11::arg("classId"), pybind11::arg("boundingBox"),
+            pybind11::arg("score"),
+            "Create a Detection. The bounding box is specified as (x, y, "
+                "width, height)"
+        )
         .def("classId", &Detection::classId, 
             "Retrieve the class id of the detection")
         .def("boundingBox",
@@ -131,21 +232,54 @@ PYBIND11_MODULE(yolov5tensorrt, m)
 
     m.def("visualizeDetection", 
         [](const Detection& detection, 
-            pybind11::array_t<uint8_t, pybind11::array::c_style |
-                                    pybind11::array::forcecast>& img,
+            pybind11::array_t<uint8_t>& img,
             const std::tuple<int, int, int>& color,
             const double& fontScale)
         {
             const cv::Scalar colorScalar(std::get<0>(color), 
                                     std::get<1>(color), std::get<2>(color));
+
+            /*  drawing is done in-place, so the image cannot be copied  */
             cv::Mat mat = arrayToMat(img);
+            if(mat.empty())
+            {
+                return RESULT_FAILURE_INVALID_INPUT;
+            }
             return visualizeDetection(detection, &mat, colorScalar, fontScale);
         },
-        pybind11::arg("detection"), pybind11::arg("img"), 
+        /*  note: the image is modified in-place, so it should not be
+            converted (i.e. copied) implicitly  */
+        pybind11::arg("detection"), pybind11::arg("img").noconvert(), 
         pybind11::arg("color"), pybind11::arg("fontScale"),
         "Helper method for visualizing a Detection in an image"
     );
 
+    m.def("visualizeDetections", 
+        [](const std::vector<Detection>& detections, 
+            pybind11::array_t<uint8_t>& img,
+            const std::tuple<int, int, int>& color,
+            const double& fontScale)
+        {
+            const cv::Scalar colorScalar(std::get<0>(color), 
+                                    std::get<1>(color), std::get<2>(color));
+
+            /*  drawing is done in-place, so the image cannot be copied  */
+            cv::Mat mat = arrayToMat(img);
+            if(mat.empty())
+            {
+                return RESULT_FAILURE_INVALID_INPUT;
+            }
+            return visualizeDetections(detections, &mat, colorScalar, 
+                                        fontScale);
+        },
+        /*  note: the image is modified in-place, so it should not be
+            converted (i.e. copied) implicitly  */
+        pybind11::arg("detections"), pybind11::arg("img").noconvert(), 
+        pybind11::arg("color"), pybind11::arg("fontScale"),
+        "Helper method for visualizing multiple Detections in an image "
+            "at once"
+    );
+
     pybind11::class_<Classes>(m, "Classes")
         .def(pybind11::init<>())
         .def("loadFromFile", &Classes::loadFromFile,
@@ -188,13 +322,27 @@ PYBIND11_MODULE(yolov5tensorrt, m)
             "Set the classes of the network")
         .def("detect", 
             [](Detector& detector, 
-                const pybind11::array_t<uint8_t, pybind11::array::c_style |
-                                    pybind11::array::forcecast>& img, 
+                const pybind11::array_t<uint8_t>& img, 
                 int flags = 0)
             {
                 std::vector<Detection> detections;
-                const Result r = 
-                        detector.detect(arrayToMat(img), &detections, flags);
+
+                /*  the image is wrapped without copying, if possible   */
+                pybind11::object copy;     /*  null unless copied  */
+                const cv::Mat mat = arrayToMat(img, &copy);
+                if(mat.empty())
+                {
+                    return pybind11::make_tuple(RESULT_FAILURE_INVALID_INPUT,
+                                                detections);
+                }
+
+                /*  release the GIL during detection, such that other Python
+                    threads (e.g. capturing frames) can run concurrently   */
+                Result r;
+                {
+                    pybind11::gil_scoped_release release;
+                    r = detector.detect(mat, &detections, flags);
+                }
                 return pybind11::make_tuple(r, detections);
             },
             pybind11::arg("img"),
@@ -203,20 +351,31 @@ PYBIND11_MODULE(yolov5tensorrt, m)
         )
         .def("detectBatch", 
             [](Detector& detector, 
-                const std::vector<
-                    pybind11::array_t<uint8_t, pybind11::array::c_style |
-                                        pybind11::array::forcecast>>& images, 
+                const std::vector<pybind11::array_t<uint8_t>>& images, 
                 int flags = 0)
             {
                 std::vector<std::vector<Detection>> detections;
 
+                /*  the images are wrapped without copying, if possible  */
+                std::vector<pybind11::object> copies(images.size());
                 std::vector<cv::Mat> mats;
                 for(unsigned int i = 0; i < images.size(); ++i)
                 {
-                    mats.push_back(arrayToMat(images[i]));
+                    mats.push_back(arrayToMat(images[i], &copies[i]));
+                    if(mats.back().empty())
+                    {
+                        return pybind11::make_tuple(
+                                RESULT_FAILURE_INVALID_INPUT, detections);
+                    }
+                }
+
+                /*  release the GIL during detection, such that other Python
+                    threads (e.g. capturing frames) can run concurrently   */
+                Result r;
+                {
+                    pybind11::gil_scoped_release release;
+                    r = detector.detectBatch(mats, &detections, flags);
                 }
-                const Result r = 
-                        detector.detectBatch(mats, &detections, flags);
                 return pybind11::make_tuple(r, detections);
             },
             pybind11::arg("images"),
@@ -32,10 +32,14 @@
 import cv2
 import yolov5tensorrt
 
+import numpy as np
+
 import argparse
 import time
 import os
 
+from concurrent.futures import ThreadPoolExecutor
+
 def main(args):
 
     #
@@ -76,20 +80,40 @@ def main(args):
 
 
     #
-    # List all files in the specified directory
+    # List all images in the specified directory. Other files (e.g. a README)
+    # are skipped based on their extension. The images are sorted by size,
+    # largest first, such that the images which take longest to decode are
+    # started on first
     #
-    filenames = os.listdir(args.inputs)
-    print("Found", len(filenames), "files in specified input directory")
+    extensions = ('.jpg', '.jpeg', '.png', '.bmp')
+    with os.scandir(args.inputs) as it:
+        entries = [e for e in it
+                    if e.is_file() and e.name.lower().endswith(extensions)]
+    entries.sort(key=lambda e: e.stat().st_size, reverse=True)
+    filenames = [e.name for e in entries]
+    print("Found", len(filenames), "images in specified input directory")
 
 
+    #
+    # Load all of the images from disk. The decoding is done by OpenCV, which
+    # releases the GIL while doing so, so the images can be loaded in parallel
+    #
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        loaded = list(executor.map(
+                    lambda f: cv2.imread(os.path.join(args.inputs, f)),
+                    filenames))
+
     images = []
-    for f in filenames:
-        image = cv2.imread(args.inputs + "/" + f)
+    imageNames = []
+    for f, image in zip(filenames, loaded):
         if image is not None:
-            images.append(image)
+            images.append(np.ascontiguousarray(image))
+            imageNames.append(f)
         else:
             print("Could not load file ", f)
-            return 1
+    if len(images) == 0:
+        print("No images could be loaded from the input directory")
+        return 1
 
 
     #
@@ -98,8 +122,8 @@ def main(args):
     # runs. These can of course also be performed on other representative
     # images
     #
-    detector.detect(image)
-    detector.detect(image)
+    detector.detect(images[0])
+    detector.detect(images[0])
 
 
     ts = time.perf_counter()
@@ -121,19 +145,27 @@ def main(args):
     # Visualize all of the detections & store to disk
     #
     magenta = (255, 51, 153)    # BGR
-    visualization = []
-    for i in range(0, len(detections)):
-        img = images[i]
-
-        lst = detections[i]
-        for d in lst:
-            yolov5tensorrt.visualizeDetection(d, img, magenta, 1.0)
-
-        #
-        # Store the visualization to disk again.
-        #
-        outputName = args.outputs + "/" + filenames[i]
-        cv2.imwrite(outputName, img)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        writes = []
+        for i in range(0, len(detections)):
+            img = images[i]
+
+            yolov5tensorrt.visualizeDetections(detections[i], img,
+                                                magenta, 1.0)
+
+            #
+            # Store the visualization to disk again. Encoding and writing
+            # is independent of everything else, so it is done in the
+            # background while the next image is visualized.
+            #
+            outputName = os.path.join(args.outputs, imageNames[i])
+            writes.append((outputName,
+                            executor.submit(cv2.imwrite, outputName, img)))
+
+        for outputName, write in writes:
+            if not write.result():
+                print("Could not write file ", outputName)
+                return 1
 
     return 0
 
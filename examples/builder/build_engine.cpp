@@ -29,6 +29,8 @@
 #include "yolov5_builder.hpp"
 
 #include <iostream>
+#include <fstream>
+#include <sstream>
 #include <algorithm>
 
 
@@ -63,6 +65,15 @@ bool cmdOptionExists(char** begin, char** end, const std::string& option,
     return true;
 }
 
+bool parseShape(const std::string& s, int* rows, int* cols)
+{
+    /*  Parse a shape of the form ROWSxCOLUMNS, e.g. 480x640   */
+    char separator = 0;
+    std::istringstream ss(s);
+    ss >> *rows >> separator >> *cols;
+    return !ss.fail() && ss.eof() && (separator == 'x' || separator == 'X');
+}
+
 void printHelp()
 {
     std::cout << "Options:\n"
@@ -71,10 +82,24 @@ void printHelp()
                 "--output :         [mandatory] specify the engine output "
                 "file\n"
                 "--precision :      [optional] specify the precision. "
-                "Options: fp32, fp16\n\n"
+                "Options: fp32, fp16 (default), int8\n"
+                "--calib-dir :      [optional] specify the directory with "
+                "calibration images (int8 only)\n"
+                "--calib-cache :    [optional] specify the calibration cache "
+                "file (int8 only)\n"
+                "--min-shape :      [optional] specify the minimum input "
+                "shape ROWSxCOLUMNS (dynamic models only)\n"
+                "--opt-shape :      [optional] specify the optimal input "
+                "shape ROWSxCOLUMNS (dynamic models only)\n"
+                "--max-shape :      [optional] specify the maximum input "
+                "shape ROWSxCOLUMNS (dynamic models only)\n"
+                "--dla-core :       [optional] specify the DLA core to "
+                "offload the engine to. Options: 0, 1\n"
+                "--allow-gpu-fallback : [optional] allow layers that are not "
+                "supported by the DLA to run on the GPU\n\n"
                 "Example usage:\n"
                 "build_engine --model yolov5.onnx --output yolov5.engine "
-                "--precision fp32" << std::endl;
+                "--precision fp16" << std::endl;
 }
 
 int main(int argc, char* argv[])
@@ -100,16 +125,20 @@ int main(int argc, char* argv[])
     const std::string modelFile(getCmdOption(argv, argv+argc, "--model"));
     const std::string outputFile(getCmdOption(argv, argv+argc, "--output"));
     
-    yolov5::Precision precision = yolov5::PRECISION_FP32;   /*  default */
+    yolov5::Precision precision = yolov5::PRECISION_FP16;   /*  default */
     if(cmdOptionExists(argv, argv+argc, "--precision", true))
     {
         const std::string s = getCmdOption(argv, argv+argc, "--precision");
         if(s == "fp32")
         {
+            precision = yolov5::PRECISION_FP32;
         }
         else if(s == "fp16")
         {
-            precision = yolov5::PRECISION_FP16;
+        }
+        else if(s == "int8")
+        {
+            precision = yolov5::PRECISION_INT8;
         }
         else
         {
@@ -119,6 +148,104 @@ int main(int argc, char* argv[])
         }
     }
 
+    /*
+        INT8 engines have to be calibrated using representative images. The
+        calibration data is cached next to the engine, such that it does not
+        have to be recomputed when building the engine again
+    */
+    std::string calibrationDirectory;
+    std::string calibrationCacheFile;
+    if(precision == yolov5::PRECISION_INT8)
+    {
+        calibrationCacheFile = outputFile + ".calib";
+        if(cmdOptionExists(argv, argv+argc, "--calib-cache", true))
+        {
+            calibrationCacheFile = getCmdOption(argv, argv+argc, 
+                                                "--calib-cache");
+        }
+
+        /*  the calibration images are not required if the cache exists  */
+        if(cmdOptionExists(argv, argv+argc, "--calib-dir", true))
+        {
+            calibrationDirectory = getCmdOption(argv, argv+argc, 
+                                                "--calib-dir");
+        }
+        else if(!std::ifstream(calibrationCacheFile).good())
+        {
+            std::cout << "INT8 precision requires a calibration directory "
+                        "(--calib-dir), unless the calibration cache exists" 
+                        << std::endl;
+            printHelp();
+            return 1;
+        }
+    }
+
+
+
+    /*
+        For models with dynamic input dimensions, the range of supported input
+        shapes has to be specified. TensorRT picks the kernels that are optimal
+        for the 'opt' shape, so this should be the shape used at runtime.
+    */
+    const bool hasProfile = cmdOptionExists(argv, argv+argc, "--opt-shape", 
+                                            true);
+    nvinfer1::Dims profile[3];
+    if(hasProfile)
+    {
+        const char* options[3] = {"--min-shape", "--opt-shape", "--max-shape"};
+        for(int i = 0; i < 3; ++i)
+        {
+            std::string s = getCmdOption(argv, argv+argc, "--opt-shape");
+            if(cmdOptionExists(argv, argv+argc, options[i], true))
+            {
+                s = getCmdOption(argv, argv+argc, options[i]);
+            }
+
+            int rows = 0, cols = 0;
+            if(!parseShape(s, &rows, &cols))
+            {
+                std::cout << "Invalid shape specified: " << s << std::endl;
+                printHelp();
+                return 1;
+            }
+            profile[i] = nvinfer1::Dims4(1, 3, rows, cols);   /*  batch 1 */
+        }
+    }
+    else if(cmdOptionExists(argv, argv+argc, "--min-shape") ||
+            cmdOptionExists(argv, argv+argc, "--max-shape"))
+    {
+        std::cout << "--min-shape and --max-shape require --opt-shape" 
+                    << std::endl;
+        printHelp();
+        return 1;
+    }
+
+
+
+    int dlaCore = -1;   /*  disabled    */
+    if(cmdOptionExists(argv, argv+argc, "--dla-core", true))
+    {
+        const std::string s = getCmdOption(argv, argv+argc, "--dla-core");
+        if(s == "0" || s == "1")
+        {
+            dlaCore = std::stoi(s);
+        }
+        else
+        {
+            std::cout << "Invalid DLA core specified: " << s << std::endl;
+            printHelp();
+            return 1;
+        }
+    }
+    const bool allowGpuFallback = cmdOptionExists(argv, argv+argc, 
+                                                "--allow-gpu-fallback");
+    if(allowGpuFallback && dlaCore < 0)
+    {
+        std::cout << "--allow-gpu-fallback requires --dla-core" << std::endl;
+        printHelp();
+        return 1;
+    }
+
 
 
     /*
@@ -150,10 +277,41 @@ int main(int argc, char* argv[])
     }
 
 
+    if(hasProfile)
+    {
+        r = builder.setOptimizationProfile(profile[0], profile[1], profile[2]);
+        if(r != yolov5::RESULT_SUCCESS)
+        {
+            std::cout << "setOptimizationProfile() failed: " 
+                        << yolov5::result_to_string(r) << std::endl;
+            return 1;
+        }
+    }
+
+
+    /*
+        On platforms with a Deep Learning Accelerator (e.g. Jetson
+        Xavier/Orin), the network can be offloaded to one of the DLA cores.
+        This is power-efficient, and leaves the GPU free for other work. The
+        DLA requires FP16 or INT8 precision, so FP32 is replaced by FP16
+    */
+    if(dlaCore >= 0)
+    {
+        r = builder.setDLACore(dlaCore, allowGpuFallback);
+        if(r != yolov5::RESULT_SUCCESS)
+        {
+            std::cout << "setDLACore() failed: " 
+                        << yolov5::result_to_string(r) << std::endl;
+            return 1;
+        }
+    }
+
+
     /*
         Build the TensorRT engine
     */
-    r = builder.buildEngine(modelFile, outputFile, precision);
+    r = builder.buildEngine(modelFile, outputFile, precision,
+                            calibrationDirectory, calibrationCacheFile);
     if(r != yolov5::RESULT_SUCCESS)
     {
         std::cout << "buildEngine() failed: " << yolov5::result_to_string(r) 
@@ -0,0 +1,240 @@
+#!/usr/bin/python
+
+#
+# Author:           Noah van der Meer
+# Description:      YoloV5-TensorRT example: persistent detector daemon
+# 
+#
+# Copyright (c) 2021, Noah van der Meer
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to 
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or 
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in 
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+# 
+#
+
+# note: import cv2 _before_ yolov5tensorrt; Otherwise it may lead to
+#   issues see https://github.com/opencv/opencv/issues/14884
+import cv2
+import yolov5tensorrt
+
+import numpy as np
+import msgpack
+
+import argparse
+import socket
+import struct
+import stat
+import os
+
+#
+# Protocol: each request consists of the size of the encoded image (e.g. a
+# JPEG or PNG file) as a 4-byte unsigned integer in network byte order,
+# followed by the encoded image itself. The reply is framed in the same way,
+# and contains a msgpack map with the result code and the detections. A
+# connection can be used for any number of requests.
+#
+# Requests larger than this are rejected, and the connection is closed,
+# such that a single client cannot make the daemon allocate up to 4 GiB
+#
+MAX_REQUEST_SIZE = 64 * 1024 * 1024
+
+def recvExact(connection, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            return None     # connection closed
+        data.extend(chunk)
+    return bytes(data)
+
+def sendReply(connection, r, detections):
+    reply = msgpack.packb({
+        'result': int(r),
+        'detections': [{
+            'classId': d.classId(),
+            'className': d.className(),
+            'boundingBox': list(d.boundingBox()),
+            'score': d.score()} for d in detections]
+    })
+    connection.sendall(struct.pack('!I', len(reply)) + reply)
+
+def decodeImage(data):
+    #
+    # Decode the image. Note that the image returned by OpenCV is already
+    # C-contiguous. Returns None if the data does not represent an image
+    #
+    if len(data) == 0:
+        return None
+    try:
+        return cv2.imdecode(np.frombuffer(data, dtype=np.uint8),
+                            cv2.IMREAD_COLOR)
+    except cv2.error:
+        return None
+
+def handleConnection(detector, connection):
+    while True:
+        header = recvExact(connection, 4)
+        if header is None:
+            return
+        size = struct.unpack('!I', header)[0]
+        if size > MAX_REQUEST_SIZE:
+            print("Request of", size, "bytes exceeds the maximum size; "
+                    "closing connection")
+            sendReply(connection, yolov5tensorrt.Result.FAILURE_INVALID_INPUT,
+                        [])
+            return
+        data = recvExact(connection, size)
+        if data is None:
+            return
+
+        image = decodeImage(data)
+        if image is None:
+            sendReply(connection, yolov5tensorrt.Result.FAILURE_INVALID_INPUT,
+                        [])
+            continue
+
+        r, detections = detector.detect(image)
+        sendReply(connection, r, detections)
+
+def removeStaleSocket(path):
+    #
+    # A socket file may remain from a previous run of the daemon, and has to
+    # be removed before binding. Anything else at the path (e.g. a mistyped
+    # path to a regular file) is left alone, as is the socket of a daemon
+    # that is still running
+    #
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return True
+
+    if not stat.S_ISSOCK(mode):
+        print("Path exists and is not a socket:", path)
+        return False
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+            print("Another daemon is already listening on", path)
+            return False
+        except ConnectionRefusedError:
+            pass    # stale socket, nobody is listening
+        except OSError as e:
+            print("Could not probe existing socket", path, ":", e)
+            return False
+
+    os.remove(path)
+    return True
+
+def main(args):
+
+    #
+    # Create and initialize the YoloV5 Detector, and load the engine. This
+    # is done only once, when the daemon is started; afterwards, each of the
+    # requests only involves the detection itself
+    #
+    detector = yolov5tensorrt.Detector()
+    r = detector.init(flags = yolov5tensorrt.DetectorFlag.USE_CUDA_GRAPH)
+    if r != yolov5tensorrt.Result.SUCCESS:
+        print("init() failed:", yolov5tensorrt.result_to_string(r))
+        return 1
+
+    r = detector.loadEngine(args.engine)
+    if r != yolov5tensorrt.Result.SUCCESS:
+        print("loadEngine() failed:", yolov5tensorrt.result_to_string(r))
+        return 1
+
+    if args.classes is not None:
+        classes = yolov5tensorrt.Classes()
+        r = classes.loadFromFile(args.classes)
+        if r != yolov5tensorrt.Result.SUCCESS:
+            print("classes.loadFromFile() failed:", 
+                    yolov5tensorrt.result_to_string(r))
+            return 1
+        detector.setClasses(classes)
+
+
+    #
+    # Listen on the Unix socket. A socket file that remains from a previous
+    # run is removed first
+    #
+    if not removeStaleSocket(args.socket):
+        return 1
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(args.socket)
+    server.listen()
+    print("Listening on", args.socket)
+
+
+    #
+    # Handle the connections one at a time, since there is only a single
+    # Detector. Clients that connect in the mean time are queued by the OS
+    #
+    try:
+        while True:
+            connection, _ = server.accept()
+            with connection:
+                #
+                # A misbehaving client should not bring down the daemon, so
+                # any error is limited to its own connection
+                #
+                try:
+                    handleConnection(detector, connection)
+                except OSError as e:
+                    print("Connection error:", e)
+                except Exception as e:
+                    print("Error handling request:", e)
+                    try:
+                        sendReply(connection,
+                            yolov5tensorrt.Result.FAILURE_INVALID_INPUT, [])
+                    except OSError:
+                        pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        try:
+            os.remove(args.socket)
+        except FileNotFoundError:
+            pass
+
+    return 0
+
+
+if __name__ == '__main__':
+    #
+    # Handle arguments
+    #
+    parser = argparse.ArgumentParser(add_help=True)
+    parser.add_argument('--engine',
+                        required = True,
+                        dest ='engine',
+                        type = str,
+                        help = '[mandatory] specify the engine file')
+    parser.add_argument('--socket',
+                        dest ='socket',
+                        type = str,
+                        default = '/tmp/yolov5tensorrt.sock',
+                        help = '[optional] specify the path of the Unix socket')
+    parser.add_argument('--classes',
+                        dest ='classes',
+                        type = str,
+                        help = '[optional] specify list of class names')
+    args = parser.parse_args()
+
+    main(args)
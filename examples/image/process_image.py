@@ -32,11 +32,103 @@
 import cv2
 import yolov5tensorrt
 
+import numpy as np
+
 import argparse
+import socket
+import struct
 import time
 
+def detectWithDaemon(socketPath, data):
+    #
+    # Send the encoded image to the detector daemon (see examples/daemon),
+    # which already has the engine loaded, and receive the detections. Each
+    # message is prefixed by its size as 4-byte unsigned integer
+    #
+    import msgpack
+
+    def recvExact(connection, size):
+        reply = bytearray()
+        while len(reply) < size:
+            chunk = connection.recv(size - len(reply))
+            if not chunk:
+                raise ConnectionError("connection closed by daemon")
+            reply.extend(chunk)
+        return bytes(reply)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socketPath)
+        connection.sendall(struct.pack('!I', len(data)) + data)
+        header = recvExact(connection, 4)
+        reply = msgpack.unpackb(
+                    recvExact(connection, struct.unpack('!I', header)[0]))
+
+    detections = []
+    for d in reply['detections']:
+        detection = yolov5tensorrt.Detection(d['classId'],
+                                    tuple(d['boundingBox']), d['score'])
+        detection.setClassName(d['className'])
+        detections.append(detection)
+    return yolov5tensorrt.Result(reply['result']), detections
+
+def mainDaemon(args):
+    #
+    # Load the image from disk. The encoded file is sent to the daemon as-is,
+    # while the decoded image is used for the visualization
+    #
+    try:
+        with open(args.input, 'rb') as f:
+            data = f.read()
+    except OSError:
+        data = b''
+    image = None
+    if len(data) > 0:
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8),
+                                cv2.IMREAD_COLOR)
+    if image is None:
+        print("Failed to load input image")
+        return 1
+
+    ts = time.perf_counter()
+
+    try:
+        r, detections = detectWithDaemon(args.daemon, data)
+    except OSError as e:
+        print("Could not communicate with the daemon:", e)
+        return 1
+    if r != yolov5tensorrt.Result.SUCCESS:
+        print("detect() failed:", yolov5tensorrt.result_to_string(r))
+        return 1
+
+    # timing
+    duration = time.perf_counter() - ts
+    print("detect() through daemon took:", duration*1000, "milliseconds")
+
+    magenta = (255, 51, 153)    # BGR
+    yolov5tensorrt.visualizeDetections(detections, image, magenta, 1.0)
+    cv2.imwrite(args.output, image)
+    return 0
+
 def main(args):
 
+    #
+    # When a detector daemon is running, it already has the engine loaded.
+    # This avoids the cost of loading the engine for every invocation of
+    # this script, e.g. when processing many images one by one
+    #
+    # The class names are then also owned by the daemon (see its --classes
+    # option), so they cannot be specified here.
+    #
+    if args.daemon is not None:
+        if args.classes is not None:
+            print("--classes cannot be used with --daemon; specify the class "
+                    "names when starting the daemon instead")
+            return 1
+        return mainDaemon(args)
+    if args.engine is None:
+        print("Either --engine or --daemon should be specified")
+        return 1
+
     #
     # Create the YoloV5 Detector object
     #
@@ -57,7 +149,11 @@ def main(args):
     # so in case of failure, you will see a more detailed description of
     # the problem in the console output
     #
-    r = detector.init()
+    # The engine is run repeatedly on inputs of the same size, so the
+    # inference is captured into a CUDA graph (after the first run) and
+    # replayed afterwards, which reduces the kernel launch overhead.
+    #
+    r = detector.init(flags = yolov5tensorrt.DetectorFlag.USE_CUDA_GRAPH)
     if r != yolov5tensorrt.Result.SUCCESS:
         print("init() failed:", yolov5tensorrt.result_to_string(r))
         return 1
@@ -95,6 +191,15 @@ def main(args):
         print("Failed to load input image")
         return 1
 
+    #
+    # The Detector uses the memory of the array directly, as long as the
+    # pixels within each row are contiguous (e.g. also for crops of a larger
+    # image). Other arrays, such as views with the channels reversed, are
+    # copied for each call and cannot be drawn into. Converting here (which
+    # is a no-op if the image already is contiguous) avoids this.
+    #
+    image = np.ascontiguousarray(image)
+
     #
     # The first one/two runs of the engine typically take significantly
     # longer. To get an accurate timing for inference, first do two
@@ -134,11 +239,12 @@ def main(args):
     #
     # The detections are provided in the form of yolov5tensorrt.Detection 
     # objects. These contain information regarding the location in the image,
-    # confidence, and class.
+    # confidence, and class. All of them are drawn at once through
+    # visualizeDetections(); for a single Detection, there is also
+    # visualizeDetection().
     #
     magenta = (255, 51, 153)    # BGR
-    for d in detections:
-        yolov5tensorrt.visualizeDetection(d, image, magenta, 1.0)
+    yolov5tensorrt.visualizeDetections(detections, image, magenta, 1.0)
 
 
     #
@@ -155,10 +261,10 @@ if __name__ == '__main__':
     #
     parser = argparse.ArgumentParser(add_help=True)
     parser.add_argument('--engine',
-                        required = True,
                         dest ='engine',
                         type = str,
-                        help = '[mandatory] specify the engine file')
+                        help = '[mandatory] specify the engine file, unless '
+                                '--daemon is used')
     parser.add_argument('--input',
                         required = True,
                         dest ='input',
@@ -173,6 +279,12 @@ if __name__ == '__main__':
                         dest ='classes',
                         type = str,
                         help = '[optional] specify list of class names')
+    parser.add_argument('--daemon',
+                        dest ='daemon',
+                        type = str,
+                        help = '[optional] specify the Unix socket of a '
+                                'running detector daemon to use instead of '
+                                'loading the engine')
     args = parser.parse_args()
 
     main(args)
\ No newline at end of file
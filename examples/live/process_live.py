@@ -32,9 +32,31 @@
 import cv2
 import yolov5tensorrt
 
+import numpy as np
+
 import argparse
+import queue
+import threading
 import time
 
+
+def captureFrames(capture, frames, stop):
+    #
+    # Read frames from the capture device in the background, such that
+    # capturing overlaps with inference. A value of None signals that no more
+    # frames could be read.
+    #
+    while not stop.is_set():
+        ret, image = capture.read()
+        if not ret:
+            frames.put(None)
+            return
+
+        # some capture backends return non-contiguous views, which would
+        # otherwise be copied inside of the Detector for every frame
+        frames.put(np.ascontiguousarray(image))
+
+
 def main(args):
 
     #
@@ -47,7 +69,11 @@ def main(args):
     # Initialize the YoloV5 Detector. This should be done first, before
     # loading the engine.
     #
-    r = detector.init()
+    # The engine is run repeatedly on inputs of the same size, so the
+    # inference is captured into a CUDA graph (after the first run) and
+    # replayed afterwards, which reduces the kernel launch overhead.
+    #
+    r = detector.init(flags = yolov5tensorrt.DetectorFlag.USE_CUDA_GRAPH)
     if r != yolov5tensorrt.Result.SUCCESS:
         print("init() failed:", yolov5tensorrt.result_to_string(r))
         return 1
@@ -91,35 +117,71 @@ def main(args):
 
 
     #
-    # Start Inference
+    # Start capturing frames in a separate thread.
     #
-    while True:
+    # Frames are gathered into batches matching the batch size of the engine,
+    # such that the engine processes multiple frames per inference run. With
+    # an engine of batch size 1, this simply processes frame by frame, but
+    # capturing still overlaps with inference.
+    #
+    batchSize = detector.batchSize()
+    frames = queue.Queue(maxsize = 2 * batchSize)
+    stop = threading.Event()
+    producer = threading.Thread(target = captureFrames,
+                                args = (capture, frames, stop),
+                                daemon = True)
+    producer.start()
 
-        ret, image = capture.read()
-        if not ret:
-            print("failure: could not read new frames")
+
+    #
+    # Start Inference
+    #
+    magenta = (255, 51, 153)    # BGR
+    result = 0
+    running = True
+    while running:
+
+        batch = []
+        while len(batch) < batchSize:
+            image = frames.get()
+            if image is None:
+                print("failure: could not read new frames")
+                running = False
+                break
+            batch.append(image)
+        if len(batch) == 0:
             break
 
-        r, detections = detector.detect(image, flags = yolov5tensorrt.DetectorFlag.INPUT_BGR)
+        r, detections = detector.detectBatch(batch,
+                            flags = yolov5tensorrt.DetectorFlag.INPUT_BGR)
         if r != yolov5tensorrt.Result.SUCCESS:
-            print("detect() failed:", yolov5tensorrt.result_to_string(r))
-            return 1
-        
+            print("detectBatch() failed:", yolov5tensorrt.result_to_string(r))
+            result = 1
+            break
+
         #
         # Visualize the detections
         #
-        magenta = (255, 51, 153)    # BGR
-        for d in detections:
-            yolov5tensorrt.visualizeDetection(d, image, magenta, 1.0)
-        cv2.imshow("live", image)
+        for image, lst in zip(batch, detections):
+            yolov5tensorrt.visualizeDetections(lst, image, magenta, 1.0)
+            cv2.imshow("live", image)
+
+            cv2.waitKey(1)
 
-        cv2.waitKey(1)
+    stop.set()
+    while producer.is_alive():
+        # unblock the producer in case it is waiting on a full queue
+        try:
+            frames.get_nowait()
+        except queue.Empty:
+            pass
+        producer.join(timeout = 0.1)
 
     capture.release()
 
     cv2.destroyAllWindows()
 
-    return 0
+    return result
 
 
 if __name__ == '__main__':
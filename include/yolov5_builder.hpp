@@ -90,16 +90,33 @@ public:
      * the init() method.
      * 
      * 
+     * When building an engine at INT8 precision, the network is calibrated
+     * using representative images, which should be stored in the directory
+     * specified as 'calibrationDirectory'. Typically, a few hundred images
+     * from the training set are sufficient. The images are pre-processed in
+     * the same way as during inference. Optionally, the calibration data
+     * can be cached to disk by specifying 'calibrationCacheFile'. If this
+     * file already exists, the calibration is not performed again, and the
+     * calibration images are not required.
+     * 
+     * 
      * @param inputFilePath     Path to ONNX model
      * @param outputFilePath    Path where output (engine) should be written
      *
      * @param precision         (optional) Desired precision
      * 
+     * @param calibrationDirectory  (optional) Directory with calibration
+     *                              images. Mandatory for INT8 precision,
+     *                              unless the calibration cache exists
+     * @param calibrationCacheFile  (optional) Path to calibration cache
+     * 
      * @return                  Result code
      */
     Result buildEngine(const std::string& inputFilePath,
                         const std::string& outputFilePath,
-                        Precision precision = PRECISION_FP32)
+                        Precision precision = PRECISION_FP32,
+                        const std::string& calibrationDirectory = "",
+                        const std::string& calibrationCacheFile = "")
                         const noexcept;
     
     /**
@@ -110,19 +127,111 @@ public:
      * the init() method.  
      * 
      * 
+     * See buildEngine(const std::string&, const std::string&, Precision,
+     *      const std::string&, const std::string&) for more information on
+     * INT8 calibration.
+     * 
+     * 
      * @param inputFilePath     Path to ONNX model
      * @param output            Output data
      * 
      * @param precision         (optional) Desired precision
      * 
+     * @param calibrationDirectory  (optional) Directory with calibration
+     *                              images. Mandatory for INT8 precision,
+     *                              unless the calibration cache exists
+     * @param calibrationCacheFile  (optional) Path to calibration cache
+     * 
      * @return Result           Result code
      */
     Result buildEngine(const std::string& inputFilePath,
                         std::vector<char>* output,
-                        Precision precision = PRECISION_FP32)
+                        Precision precision = PRECISION_FP32,
+                        const std::string& calibrationDirectory = "",
+                        const std::string& calibrationCacheFile = "")
                         const noexcept;
 
 
+    /**
+     * @brief                   Set the optimization profile for models with
+     *                          dynamic input dimensions
+     * 
+     * If the ONNX model was exported with dynamic input dimensions (e.g.
+     * using the --dynamic option of YOLOv5), the range of input dimensions 
+     * that the engine should support has to be specified. TensorRT selects 
+     * the kernels that are optimal for the 'opt' dimensions, so these should
+     * correspond to the dimensions that will be used at runtime (e.g. the
+     * resolution of the camera). The Detector also uses the 'opt' dimensions
+     * when loading such an engine.
+     * 
+     * All dimensions are in NCHW format, i.e. (batch size, 3, rows, columns),
+     * and should satisfy min <= opt <= max for each dimension. The profile
+     * applies to all engines built afterwards.
+     * 
+     * 
+     * @param min               Minimum input dimensions
+     * @param opt               Optimal input dimensions
+     * @param max               Maximum input dimensions
+     * 
+     * @return                  Result code
+     */
+    Result setOptimizationProfile(const nvinfer1::Dims& min,
+                        const nvinfer1::Dims& opt,
+                        const nvinfer1::Dims& max) noexcept;
+
+
+    /**
+     * @brief                   Offload the engine to a Deep Learning
+     *                          Accelerator (DLA) core
+     * 
+     * Some NVIDIA Jetson platforms (e.g. Xavier, Orin) contain DLA cores,
+     * which are fixed-function accelerators for layers such as convolutions.
+     * Running the network (mostly the convolutional backbone) on a DLA core
+     * is power-efficient, and leaves the GPU available for e.g.
+     * pre-processing, other camera streams or other networks.
+     * 
+     * The DLA only supports FP16 and INT8 precision; when building an engine
+     * at FP32 precision, FP16 is used instead. Not all layers of YOLOv5 can
+     * run on the DLA, so typically GPU fallback should be allowed. This is
+     * disabled by default: without it, building the engine fails if any layer
+     * is unsupported, rather than silently running parts of the network on
+     * the GPU. The setting applies to all engines built afterwards.
+     * 
+     * 
+     * @param dlaCore           Index of the DLA core to use, or -1 to disable
+     *                          DLA offload (default)
+     * @param allowGpuFallback  (optional) Whether layers that are not
+     *                          supported by the DLA may run on the GPU.
+     *                          Disabled by default
+     * 
+     * @return                  Result code
+     */
+    Result setDLACore(const int& dlaCore, 
+                        const bool& allowGpuFallback = false) noexcept;
+
+
+    /**
+     * @brief                   Retrieve the input dimensions of an ONNX model
+     * 
+     * The Builder should have been initialized already through
+     * the init() method.
+     * 
+     * Dynamic dimensions (e.g. of a model exported using the --dynamic 
+     * option of YOLOv5) are reported as -1. This can for instance be used to
+     * check whether the batch size of the model can be chosen through
+     * setOptimizationProfile().
+     * 
+     * 
+     * @param inputFilePath     Path to ONNX model
+     * @param dims              Output input dimensions, in NCHW format
+     * 
+     * @return                  Result code
+     */
+    Result inputDimensions(const std::string& inputFilePath,
+                        nvinfer1::Dims* dims) const noexcept;
+
+
+
     /// ***
 	///	Logging
     /// ***
@@ -151,13 +260,26 @@ public:
 private:
     Result _buildEngine(const std::string& inputFilePath,
                         std::shared_ptr<nvinfer1::IHostMemory>* output,
-                        Precision precision) const noexcept;
+                        Precision precision,
+                        const std::string& calibrationDirectory,
+                        const std::string& calibrationCacheFile)
+                        const noexcept;
 
 private:
     bool                        _initialized;
 
     std::shared_ptr<Logger>     _logger;
 
+    /*  optimization profile, for models with dynamic input dimensions  */
+    bool                        _hasOptimizationProfile;
+    nvinfer1::Dims              _profileMin;
+    nvinfer1::Dims              _profileOpt;
+    nvinfer1::Dims              _profileMax;
+
+    /*  DLA offload. Disabled if _dlaCore is negative   */
+    int                         _dlaCore;
+    bool                        _allowGpuFallback;
+
     std::unique_ptr<TensorRT_Logger>                _trtLogger;
 };
 
@@ -0,0 +1,119 @@
+/**
+ * @file
+ * 
+ * @author      Noah van der Meer
+ * @brief       YoloV5 inference through TensorRT (builder internals)
+ * 
+ * 
+ * Copyright (c) 2021, Noah van der Meer
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy
+ * of this software and associated documentation files (the "Software"), to 
+ * deal in the Software without restriction, including without limitation the
+ * rights to use, copy, modify, merge, publish, distribute, sublicense, and/or 
+ * sell copies of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in 
+ * all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+ * AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+ * LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+ * FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+ * IN THE SOFTWARE.
+ * 
+ */
+
+/*  include guard   */
+#ifndef _YOLOV5_BUILDER_INTERNAL_HPP_
+#define _YOLOV5_BUILDER_INTERNAL_HPP_
+
+#include "yolov5_detector_internal.hpp"
+#include "yolov5_logging.hpp"
+
+#include <string>
+#include <vector>
+
+#include <NvInfer.h>
+
+namespace yolov5
+{
+
+namespace internal
+{
+
+/**
+ * INT8 entropy calibrator, which feeds TensorRT with representative images
+ * from a directory during the calibration of an INT8 engine.
+ * 
+ * The images are pre-processed in exactly the same way as during inference,
+ * through the CvCpuPreprocessor. Optionally, the resulting calibration table
+ * is cached to disk, such that engines can be rebuilt without repeating the
+ * calibration.
+ */
+class Int8Calibrator : public nvinfer1::IInt8EntropyCalibrator2
+{
+public:
+    Int8Calibrator() noexcept;
+
+    virtual ~Int8Calibrator() noexcept;
+
+private:
+    Int8Calibrator(const Int8Calibrator&);
+
+public:
+
+    /**
+     * @brief               Set up the calibrator
+     * 
+     * @param logger        Logger to be used
+     * @param inputDims     Dimensions of the network input
+     * @param directory     Directory in which the calibration images are
+     *                      stored. Files that can not be loaded as an image
+     *                      are ignored
+     * @param cacheFilePath Path to the calibration cache. Can be empty, in
+     *                      which case no caching is performed
+     * 
+     * @return              Result code
+     */
+    Result setup(const std::shared_ptr<Logger>& logger,
+                    const nvinfer1::Dims& inputDims,
+                    const std::string& directory,
+                    const std::string& cacheFilePath) noexcept;
+
+
+    virtual int32_t getBatchSize() const noexcept override;
+
+    virtual bool getBatch(void* bindings[], const char* names[], 
+                    int32_t nbBindings) noexcept override;
+
+    virtual const void* readCalibrationCache(std::size_t& length)
+                    noexcept override;
+
+    virtual void writeCalibrationCache(const void* ptr, 
+                    std::size_t length) noexcept override;
+
+private:
+    std::shared_ptr<Logger>     _logger;
+
+    nvinfer1::Dims              _inputDims;
+    std::string                 _cacheFilePath;
+
+    std::vector<std::string>    _files;
+    unsigned int                _nextFile;
+
+    CvCpuPreprocessor           _preprocessor;
+    void*                       _deviceMemory;
+
+    std::vector<char>           _cache;
+};
+
+
+}   /*  namespace internal  */
+
+}   /*  namespace yolov5    */
+
+#endif  /*  include guard   */
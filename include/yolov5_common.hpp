@@ -142,6 +142,9 @@ enum Precision
     PRECISION_FP32          = 0,    /**<    32-bit floating point mode  */
 
     PRECISION_FP16          = 1,    /**<    16-bit floating point mode  */
+
+    PRECISION_INT8          = 2,    /**<    8-bit integer mode; requires
+                                            calibration data */
 };
 
 /**
@@ -153,6 +156,7 @@ enum Precision
  * Outputs:
  * - PRECISION_FP32:                "fp32"
  * - PRECISION_FP16:                "fp16"
+ * - PRECISION_INT8:                "int8"
  * - In case of an invalid input:   "" (empty string)
  * 
  * @param p         Precision
@@ -190,8 +194,14 @@ enum DetectorFlag
     PREPROCESSOR_CVCUDA     =   4,
     /**<    OpenCV-CUDA pre-processing should be used */
     
-    PREPROCESSOR_CVCPU      =   8
+    PREPROCESSOR_CVCPU      =   8,
     /**<    OpenCV-CPU pre-processing should be used */
+
+    PREPROCESSOR_CUDA       =   16,
+    /**<    fused CUDA-kernel pre-processing should be used */
+
+    USE_CUDA_GRAPH          =   32
+    /**<    inference should be captured into, and replayed as a CUDA graph */
 };
 
 
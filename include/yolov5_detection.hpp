@@ -129,6 +129,10 @@ private:
  * a small label indicating the class(name) and the confidence. These texts
  * are drawn in white.
  * 
+ * The labels are rendered once and cached (per thread), such that drawing
+ * a label that was drawn before (e.g. in a previous frame) only involves a
+ * masked copy of the pixels.
+ * 
  * @param detection     Detection
  * @param image         Output image. Can be nullptr, in which case this
  *                      function has no effect.
@@ -148,6 +152,29 @@ Result visualizeDetection(const Detection& detection, cv::Mat* image,
                             const double& fontScale) noexcept;
 
 
+/**
+ * @brief               Helper method for visualizing multiple Detections in 
+ *                      an image
+ * 
+ * See visualizeDetection(const Detection&, cv::Mat*, const cv::Scalar&,
+ *      const double&) for more information. This is equivalent to calling
+ * visualizeDetection() for each of the detections, but avoids the overhead of
+ * a separate call per detection (e.g. in the Python API).
+ * 
+ * @param detections    Detections
+ * @param image         Output image. Can be nullptr, in which case this
+ *                      function has no effect.
+ *
+ * @param color         Color of the bounding boxes
+ * @param fontScale     Scaling for the labels. E.g. 1.0
+ * 
+ * @return              Result code 
+ */
+Result visualizeDetections(const std::vector<Detection>& detections, 
+                            cv::Mat* image, const cv::Scalar& color, 
+                            const double& fontScale) noexcept;
+
+
 /**
  * Represents the classes of your model
  * 
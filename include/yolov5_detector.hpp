@@ -113,6 +113,21 @@ public:
      * - PREPROCESSOR_CVCPU : specify that the OpenCV-CPU pre-processor
      *  should be used. This pre-processor is always available.
      * 
+     * - PREPROCESSOR_CUDA : specify that the CUDA pre-processor should be
+     *  used. This pre-processor performs the letterboxing, color conversion
+     *  and normalization in a single, fused CUDA kernel, and does not depend
+     *  on OpenCV-CUDA. It only supports 8-bit, 3-channel inputs.
+     * 
+     * At most one of the pre-processor flags can be specified.
+     * 
+     * - USE_CUDA_GRAPH : specify that inference should be performed through
+     *  a CUDA graph. The inference (i.e. TensorRT execution and the transfer
+     *  of the output) is captured into a CUDA graph on the second detection,
+     *  and replayed on all subsequent detections. This eliminates most of the 
+     *  kernel launch overhead, which can be significant for small models.
+     *  The graph is captured again whenever a new engine is loaded. If the
+     *  capture fails, inference falls back to regular execution.
+     * 
      * Any unsupported flags are ignored.
      * 
      * 
@@ -152,6 +167,10 @@ public:
      * If an engine is already loaded, this method will first fully load the
      * new engine, and only if this is successfull, the old engine is replaced.
      * 
+     * Engines with dynamic input dimensions are supported; in this case, the 
+     * optimal ('opt') dimensions of the first optimization profile are used
+     * for inference.
+     * 
      * 
      * @param filepath          Path to engine file in filesystem
      * 
@@ -457,6 +476,13 @@ private:
      */
     Result _inference(const char* logid);
 
+    /**
+     * @brief                   Enqueue the TensorRT engine and the transfer
+     *                          of the output on the specified stream, without
+     *                          synchronizing
+     */
+    Result _enqueue(const char* logid, cudaStream_t stream);
+
     /**
      * @brief                   Decode network output, convert to
      *                          proper Detection objects
@@ -492,7 +518,12 @@ private:
 
     internal::DeviceMemory          _deviceMemory;
 
-    std::vector<float>              _outputHostMemory;
+    internal::HostMemory            _outputHostMemory;
+
+    /*  CUDA graph  */
+    bool                            _useCudaGraph;
+    bool                            _warmedUp;  /*  first run performed */
+    internal::CudaGraph             _cudaGraph;
 };
 
 }   /*  namespace yolov5    */
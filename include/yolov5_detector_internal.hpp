@@ -86,6 +86,13 @@ public:
 
     static bool setup(const std::unique_ptr<nvinfer1::ICudaEngine>& engine,
                     const int& index, EngineBinding* binding) noexcept;
+
+    /**
+     * @brief           Update the dimensions of the binding to the ones used
+     *                  by an execution context. This is used for engines
+     *                  with dynamic dimensions.
+     */
+    void setDims(const nvinfer1::Dims& dims) noexcept;
 private:
     int                 _index;
 
@@ -135,15 +142,22 @@ public:
      *                  engine
      * 
      * 
+     * The binding dimensions are taken from the execution context, such
+     * that for engines with dynamic dimensions, the memory corresponds to 
+     * the input dimensions that were set on the context.
+     * 
+     * 
      * @param logger    Logger to be used
      * 
      * @param engine    TensorRT engine
+     * @param context   TensorRT execution context
      * @param output    Output
      * 
      * @return Result   Result code
      */
     static Result setup(const std::shared_ptr<Logger>& logger, 
                     std::unique_ptr<nvinfer1::ICudaEngine>& engine,
+                    std::unique_ptr<nvinfer1::IExecutionContext>& context,
                     DeviceMemory* output) noexcept;
 
 private:
@@ -151,6 +165,113 @@ private:
 };
 
 
+/**
+ * Used to manage page-locked (pinned) memory on the host. Transfers between
+ * pinned memory and the CUDA device can be performed asynchronously, and do
+ * not have to be staged through an intermediate buffer by the CUDA driver.
+ */
+class HostMemory
+{
+public:
+    HostMemory() noexcept;
+
+    ~HostMemory() noexcept;
+
+private:
+    HostMemory(const HostMemory&);
+
+public:
+
+    void swap(HostMemory& other) noexcept;
+
+    /**
+     * @brief           Get the beginning of the data
+     */
+    float* data() const noexcept;
+
+    /**
+     * @brief           Number of elements (floats) in the memory
+     */
+    const int& size() const noexcept;
+
+    /**
+     * @brief           Try setting up the pinned memory
+     * 
+     * 
+     * @param logger    Logger to be used
+     * 
+     * @param size      Number of elements (floats)
+     * @param output    Output
+     * 
+     * @return Result   Result code
+     */
+    static Result setup(const std::shared_ptr<Logger>& logger, 
+                    const int& size, HostMemory* output) noexcept;
+
+private:
+    float*              _memory;
+    int                 _size;
+};
+
+
+/**
+ * Used to capture a sequence of operations on a CUDA stream into a CUDA
+ * graph, which can afterwards be launched repeatedly with a single call.
+ */
+class CudaGraph
+{
+public:
+    CudaGraph() noexcept;
+
+    ~CudaGraph() noexcept;
+
+private:
+    CudaGraph(const CudaGraph&);
+
+public:
+
+    /**
+     * @brief           Query whether a graph has been captured and
+     *                  instantiated
+     */
+    bool isCaptured() const noexcept;
+
+    /**
+     * @brief           Destroy the captured graph, if any
+     */
+    void reset() noexcept;
+
+    /**
+     * @brief           Start capturing the operations issued on the stream
+     * 
+     * @return          Result code
+     */
+    Result beginCapture(const std::shared_ptr<Logger>& logger,
+                    cudaStream_t stream) noexcept;
+
+    /**
+     * @brief           Stop capturing, and instantiate the graph. Note that
+     *                  the captured operations are not executed yet
+     * 
+     * @return          Result code
+     */
+    Result endCapture(const std::shared_ptr<Logger>& logger,
+                    cudaStream_t stream) noexcept;
+
+    /**
+     * @brief           Launch the instantiated graph on the stream
+     * 
+     * @return          Result code
+     */
+    Result launch(const std::shared_ptr<Logger>& logger,
+                    cudaStream_t stream) noexcept;
+
+private:
+    cudaGraph_t         _graph;
+    cudaGraphExec_t     _graphExec;
+};
+
+
 /**
  * @brief               Check whether OpenCV-CUDA is supported
  */
@@ -317,11 +438,99 @@ private:
 
     std::vector<std::vector<cv::Mat>>   _inputChannels;
 
-    std::vector<float>                  _hostInputMemory;
+    HostMemory      _hostInputMemory;
     float*          _deviceInputMemory;
 };
 
 
+/**
+ * Preprocessing based on letterboxing with a single, fused CUDA kernel. The
+ * kernel performs the bilinear resize, letterbox border, channel swap,
+ * normalization and HWC to CHW conversion at once, writing directly into
+ * the network input on the CUDA device. This does not require OpenCV-CUDA.
+ * 
+ * Only 8-bit, 3-channel inputs (CV_8UC3) are supported.
+ */
+class CudaPreprocessor : public Preprocessor
+{
+public:
+    CudaPreprocessor() noexcept;
+
+    virtual ~CudaPreprocessor() noexcept;
+
+public:
+
+    virtual bool setup(const nvinfer1::Dims& inputDims,
+                        const int& flags, const int& batchSize,
+                        float* inputMemory) 
+                        noexcept override;
+
+    virtual void reset() noexcept override;
+
+    virtual bool process(const int& index, 
+                    const cv::Mat& input, const bool& last) noexcept override;
+
+    virtual bool process(const int& index, 
+                    const cv::cuda::GpuMat& input, const bool& last)
+                    noexcept override;
+
+    virtual cudaStream_t cudaStream() const noexcept override;
+
+    virtual bool synchronizeCudaStream() noexcept override;
+
+private:
+    /**
+     * @brief               Launch the pre-processing kernel for an input
+     *                      that is already on the CUDA device
+     */
+    bool _process(const int& index, const unsigned char* input, 
+                    const size_t& step, const cv::Size& size) noexcept;
+
+private:
+    cudaStream_t    _cudaStream;
+
+    InputType       _lastType;
+    int             _lastBatchSize;
+
+    int             _networkCols;
+    int             _networkRows;
+
+    float*          _deviceInputMemory;
+
+    /*  staging buffers for uploading the raw input, only reallocated when
+        the input size grows. There is a pinned host buffer for each image
+        in the batch, such that the uploads of the whole batch can be queued
+        without synchronizing. The device buffer can be shared, since the
+        uploads and kernels are ordered on the stream   */
+    std::vector<unsigned char*> _hostBuffers;
+    std::vector<size_t>         _hostBufferSizes;
+    unsigned char*  _deviceBuffer;
+    size_t          _deviceBufferSize;
+};
+
+
+/**
+ * @brief               Launch the fused letterbox pre-processing kernel
+ * 
+ * The input is an 8-bit, 3-channel image (HWC) on the CUDA device. It is
+ * resized to the box size using bilinear interpolation and placed at
+ * (leftWidth, topHeight) in the network input; the remainder is filled
+ * with zeros. The output is normalized to [0, 1] and stored as planar RGB 
+ * (CHW) floats.
+ * 
+ * Implemented in yolov5_preprocess.cu
+ * 
+ * @return              CUDA error code
+ */
+cudaError_t launchLetterboxKernel(const unsigned char* input, 
+                    const size_t& inputStep, const int& inputCols, 
+                    const int& inputRows, float* output, 
+                    const int& networkCols, const int& networkRows,
+                    const int& boxCols, const int& boxRows,
+                    const int& leftWidth, const int& topHeight,
+                    const bool& swapRB, cudaStream_t stream) noexcept;
+
+
 /**
  * Preprocessing based on letterboxing with OpenCV-CUDA operations. Note
  * that OpenCV-CUDA must be available for this. If not, this class will
@@ -364,6 +573,8 @@ private:
     int                 _networkCols;
     int                 _networkRows;
 
+    cv::cuda::HostMem   _hostBuffer;    /*  pinned staging buffer for uploads */
+
     cv::cuda::GpuMat    _buffer0;
     cv::cuda::GpuMat    _buffer1;
     cv::cuda::GpuMat    _buffer2;
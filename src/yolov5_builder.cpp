@@ -28,6 +28,7 @@
  */
 
 #include "yolov5_builder.hpp"
+#include "yolov5_builder_internal.hpp"
 
 #include <NvOnnxParser.h>
 
@@ -36,7 +37,9 @@
 namespace yolov5
 {
 
-Builder::Builder() noexcept : _initialized(false)
+Builder::Builder() noexcept 
+    : _initialized(false), _hasOptimizationProfile(false), _dlaCore(-1),
+        _allowGpuFallback(false)
 {
 }
 
@@ -80,7 +83,9 @@ Result Builder::init() noexcept
 }
 
 Result Builder::buildEngine(const std::string& inputFilePath,
-                        const std::string& outputFilePath, Precision precision)
+                        const std::string& outputFilePath, Precision precision,
+                        const std::string& calibrationDirectory,
+                        const std::string& calibrationCacheFile)
                         const noexcept
 {
     if(!_initialized)
@@ -94,7 +99,8 @@ Result Builder::buildEngine(const std::string& inputFilePath,
     }
 
     std::shared_ptr<nvinfer1::IHostMemory> engineOutput;
-    Result r = _buildEngine(inputFilePath, &engineOutput, precision);
+    Result r = _buildEngine(inputFilePath, &engineOutput, precision,
+                            calibrationDirectory, calibrationCacheFile);
     if(r != RESULT_SUCCESS)
     {
         return r;
@@ -119,7 +125,9 @@ Result Builder::buildEngine(const std::string& inputFilePath,
 }
 
 Result Builder::buildEngine(const std::string& inputFilePath,
-                        std::vector<char>* output, Precision precision)
+                        std::vector<char>* output, Precision precision,
+                        const std::string& calibrationDirectory,
+                        const std::string& calibrationCacheFile)
                         const noexcept
 {
     if(!_initialized)
@@ -133,7 +141,8 @@ Result Builder::buildEngine(const std::string& inputFilePath,
     }
 
     std::shared_ptr<nvinfer1::IHostMemory> engineOutput;
-    Result r = _buildEngine(inputFilePath, &engineOutput, precision);
+    Result r = _buildEngine(inputFilePath, &engineOutput, precision,
+                            calibrationDirectory, calibrationCacheFile);
     if(r != RESULT_SUCCESS)
     {
         return r;
@@ -159,6 +168,103 @@ Result Builder::buildEngine(const std::string& inputFilePath,
     return RESULT_SUCCESS;
 }
     
+Result Builder::setOptimizationProfile(const nvinfer1::Dims& min,
+                        const nvinfer1::Dims& opt,
+                        const nvinfer1::Dims& max) noexcept
+{
+    bool valid = (min.nbDims == 4 && opt.nbDims == 4 && max.nbDims == 4);
+    for(int i = 0; valid && i < 4; ++i)
+    {
+        valid = (min.d[i] > 0 && min.d[i] <= opt.d[i] && opt.d[i] <= max.d[i]);
+    }
+    if(!valid)
+    {
+        if(_logger)
+        {
+            std::string minStr, optStr, maxStr;
+            internal::dimsToString(min, &minStr);
+            internal::dimsToString(opt, &optStr);
+            internal::dimsToString(max, &maxStr);
+            _logger->logf(LOGGING_ERROR, "[Builder] setOptimizationProfile() "
+                        "failure: invalid dimensions specified: min %s, "
+                        "opt %s, max %s", minStr.c_str(), optStr.c_str(), 
+                        maxStr.c_str());
+        }
+        return RESULT_FAILURE_INVALID_INPUT;
+    }
+
+    _profileMin = min;
+    _profileOpt = opt;
+    _profileMax = max;
+    _hasOptimizationProfile = true;
+    return RESULT_SUCCESS;
+}
+
+Result Builder::setDLACore(const int& dlaCore, 
+                        const bool& allowGpuFallback) noexcept
+{
+    if(dlaCore < -1)
+    {
+        if(_logger)
+        {
+            _logger->logf(LOGGING_ERROR, "[Builder] setDLACore() failure: "
+                        "invalid DLA core specified: %i", dlaCore);
+        }
+        return RESULT_FAILURE_INVALID_INPUT;
+    }
+
+    _dlaCore = dlaCore;
+    _allowGpuFallback = allowGpuFallback;
+    return RESULT_SUCCESS;
+}
+
+Result Builder::inputDimensions(const std::string& inputFilePath,
+                        nvinfer1::Dims* dims) const noexcept
+{
+    if(!_initialized)
+    {
+        if(_logger)
+        {
+            _logger->log(LOGGING_ERROR, "[Builder] inputDimensions() failure: "
+                        "builder is not initialized yet");
+        }
+        return RESULT_FAILURE_NOT_INITIALIZED;
+    }
+
+    try
+    {
+        std::unique_ptr<nvinfer1::IBuilder> builder(
+                        nvinfer1::createInferBuilder(*_trtLogger));
+
+        const auto explicitBatch = 1U << static_cast<uint32_t>(
+                nvinfer1::NetworkDefinitionCreationFlag::kEXPLICIT_BATCH);
+        std::unique_ptr<nvinfer1::INetworkDefinition> network(
+                        builder->createNetworkV2(explicitBatch));
+
+        std::unique_ptr<nvonnxparser::IParser> parser(
+                        nvonnxparser::createParser(*network, *_trtLogger));
+        if(!parser->parseFromFile(inputFilePath.c_str(),
+                        (int)nvinfer1::ILogger::Severity::kWARNING))
+        {
+            _logger->log(LOGGING_ERROR, "[Builder] inputDimensions() failure: "
+                    "could not parse ONNX model from file");
+            return RESULT_FAILURE_MODEL_ERROR;
+        }
+
+        if(dims)
+        {
+            *dims = network->getInput(0)->getDimensions();
+        }
+    }
+    catch(const std::exception& e)
+    {
+        _logger->logf(LOGGING_ERROR, "[Builder] inputDimensions() failure: got "
+                    "exception: %s", e.what());
+        return RESULT_FAILURE_OTHER;
+    }
+    return RESULT_SUCCESS;
+}
+
 Result Builder::setLogger(std::shared_ptr<Logger> logger) noexcept
 {
     if(!logger)
@@ -182,7 +288,9 @@ std::shared_ptr<Logger> Builder::logger() const noexcept
 
 Result Builder::_buildEngine(const std::string& inputFilePath,
                         std::shared_ptr<nvinfer1::IHostMemory>* output,
-                        Precision precision)
+                        Precision precision,
+                        const std::string& calibrationDirectory,
+                        const std::string& calibrationCacheFile)
                         const noexcept
 {
     const char* precisionStr = precision_to_string(precision);
@@ -219,6 +327,93 @@ Result Builder::_buildEngine(const std::string& inputFilePath,
                         builder->createBuilderConfig());
         config->setMaxWorkspaceSize(1 << 20);
 
+        /*  Set up the optimization profile, for dynamic input dimensions */
+        nvinfer1::ITensor* input = network->getInput(0);
+        nvinfer1::Dims inputDims = input->getDimensions();
+        nvinfer1::IOptimizationProfile* profile = nullptr;
+
+        bool isDynamic = false;
+        for(int i = 0; i < inputDims.nbDims; ++i)
+        {
+            isDynamic = isDynamic || (inputDims.d[i] == -1);
+        }
+
+        if(isDynamic)
+        {
+            if(!_hasOptimizationProfile)
+            {
+                _logger->log(LOGGING_ERROR, "[Builder] buildEngine() failure: "
+                        "model has dynamic input dimensions, but no "
+                        "optimization profile was specified");
+                return RESULT_FAILURE_INVALID_INPUT;
+            }
+
+            profile = builder->createOptimizationProfile();
+            if(!profile->setDimensions(input->getName(), 
+                            nvinfer1::OptProfileSelector::kMIN, _profileMin) ||
+                !profile->setDimensions(input->getName(), 
+                            nvinfer1::OptProfileSelector::kOPT, _profileOpt) ||
+                !profile->setDimensions(input->getName(), 
+                            nvinfer1::OptProfileSelector::kMAX, _profileMax) ||
+                config->addOptimizationProfile(profile) < 0)
+            {
+                _logger->log(LOGGING_ERROR, "[Builder] buildEngine() failure: "
+                        "could not set up optimization profile");
+                return RESULT_FAILURE_TENSORRT_ERROR;
+            }
+
+            std::string optStr;
+            internal::dimsToString(_profileOpt, &optStr);
+            _logger->logf(LOGGING_INFO, "[Builder] buildEngine(): model has "
+                    "dynamic input dimensions, optimizing for %s", 
+                    optStr.c_str());
+
+            /*  calibration is performed at the optimal dimensions  */
+            inputDims = _profileOpt;
+        }
+        else if(_hasOptimizationProfile)
+        {
+            _logger->log(LOGGING_WARNING, "[Builder] buildEngine() warning: "
+                    "model has static input dimensions; ignoring the "
+                    "optimization profile");
+        }
+
+        /*  Set up DLA offload. Note that the DLA requires fp16 or int8  */
+        if(_dlaCore >= 0)
+        {
+            if(_dlaCore >= builder->getNbDLACores())
+            {
+                _logger->logf(LOGGING_ERROR, "[Builder] buildEngine() failure: "
+                        "DLA core %i specified, but current platform has %i "
+                        "DLA core(s)", _dlaCore, builder->getNbDLACores());
+                return RESULT_FAILURE_INVALID_INPUT;
+            }
+
+            if(precision == PRECISION_FP32)
+            {
+                _logger->log(LOGGING_WARNING, "[Builder] buildEngine() "
+                        "warning: DLA does not support fp32 precision; "
+                        "using fp16 precision instead");
+                precision = PRECISION_FP16;
+                precisionStr = precision_to_string(precision);
+            }
+
+            config->setDefaultDeviceType(nvinfer1::DeviceType::kDLA);
+            config->setDLACore(_dlaCore);
+            if(_allowGpuFallback)
+            {
+                config->setFlag(nvinfer1::BuilderFlag::kGPU_FALLBACK);
+            }
+
+            _logger->logf(LOGGING_INFO, "[Builder] buildEngine(): offloading "
+                    "to DLA core %i, GPU fallback: %s", _dlaCore, 
+                    (_allowGpuFallback ? "enabled" : "disabled"));
+        }
+
+        /*  note: the calibrator is used while building, and should thus
+                outlive the call to buildSerializedNetwork()  */
+        internal::Int8Calibrator calibrator;
+
         if(precision == PRECISION_FP32)
         {
             /*  this is the default */
@@ -234,6 +429,46 @@ Result Builder::_buildEngine(const std::string& inputFilePath,
             }
             config->setFlag(nvinfer1::BuilderFlag::kFP16);
         }
+        else if(precision == PRECISION_INT8)
+        {
+            if(!builder->platformHasFastInt8())
+            {
+                _logger->log(LOGGING_ERROR, "[Builder] buildEngine() failure: "
+                            "int8 precision specified, but not supported by "
+                            "current platform");   
+                return RESULT_FAILURE_INVALID_INPUT;
+            }
+            if(calibrationDirectory.length() == 0 && 
+                calibrationCacheFile.length() == 0)
+            {
+                _logger->log(LOGGING_ERROR, "[Builder] buildEngine() failure: "
+                            "int8 precision specified, but neither a "
+                            "calibration directory nor a calibration cache "
+                            "provided");
+                return RESULT_FAILURE_INVALID_INPUT;
+            }
+
+            const Result r = calibrator.setup(_logger, inputDims,
+                            calibrationDirectory, calibrationCacheFile);
+            if(r != RESULT_SUCCESS)
+            {
+                _logger->log(LOGGING_ERROR, "[Builder] buildEngine() failure: "
+                            "could not set up int8 calibrator");
+                return r;
+            }
+            config->setFlag(nvinfer1::BuilderFlag::kINT8);
+            config->setInt8Calibrator(&calibrator);
+            if(profile)
+            {
+                config->setCalibrationProfile(profile);
+            }
+
+            /*  layers without int8 implementation can fall back to fp16  */
+            if(builder->platformHasFastFp16())
+            {
+                config->setFlag(nvinfer1::BuilderFlag::kFP16);
+            }
+        }
     
         _logger->logf(LOGGING_INFO, "[Builder] buildEngine(): building and "
                 "serializing engine at %s precision. This may take a while",
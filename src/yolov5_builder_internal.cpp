@@ -0,0 +1,279 @@
+/**
+ * @file
+ * 
+ * @author      Noah van der Meer
+ * @brief       YoloV5 inference through TensorRT (builder internals)
+ * 
+ * 
+ * Copyright (c) 2021, Noah van der Meer
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy
+ * of this software and associated documentation files (the "Software"), to 
+ * deal in the Software without restriction, including without limitation the
+ * rights to use, copy, modify, merge, publish, distribute, sublicense, and/or 
+ * sell copies of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in 
+ * all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+ * AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+ * LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+ * FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+ * IN THE SOFTWARE.
+ * 
+ */
+
+#include "yolov5_builder_internal.hpp"
+
+#include <fstream>
+#include <iterator>
+
+#include <cuda_runtime_api.h>
+
+namespace yolov5
+{
+
+namespace internal
+{
+
+Int8Calibrator::Int8Calibrator() noexcept 
+    : _nextFile(0), _deviceMemory(nullptr)
+{
+}
+
+Int8Calibrator::~Int8Calibrator() noexcept
+{
+    if(_deviceMemory)
+    {
+        cudaFree(_deviceMemory);
+    }
+}
+
+Result Int8Calibrator::setup(const std::shared_ptr<Logger>& logger,
+                    const nvinfer1::Dims& inputDims,
+                    const std::string& directory,
+                    const std::string& cacheFilePath) noexcept
+{
+    _logger = logger;
+    _preprocessor.setLogger(logger);
+    _inputDims = inputDims;
+
+    if(inputDims.nbDims != 4)
+    {
+        std::string str;
+        dimsToString(inputDims, &str);
+        _logger->logf(LOGGING_ERROR, "[Int8Calibrator] setup() failure: "
+                    "unexpected input dimensions: %s", str.c_str());
+        return RESULT_FAILURE_MODEL_ERROR;
+    }
+
+    /*  If a calibration cache exists already, the calibration is not 
+        performed again, so the calibration images are not required   */
+    bool hasCache = false;
+    try
+    {
+        _cacheFilePath = cacheFilePath;
+        if(_cacheFilePath.length() > 0)
+        {
+            std::ifstream file(_cacheFilePath, 
+                                std::ios::binary | std::ios::ate);
+            hasCache = file.good() && file.tellg() > 0;
+        }
+    }
+    catch(const std::exception& e)
+    {
+        _logger->logf(LOGGING_ERROR, "[Int8Calibrator] setup() failure: "
+                    "got exception: %s", e.what());
+        return RESULT_FAILURE_OTHER;
+    }
+
+    _files.clear();
+    _nextFile = 0;
+    if(directory.length() > 0)
+    {
+        try
+        {
+            std::vector<cv::String> files;
+            cv::glob(directory, files, false);
+            _files.assign(files.begin(), files.end());
+        }
+        catch(const std::exception& e)
+        {
+            if(!hasCache)
+            {
+                _logger->logf(LOGGING_ERROR, "[Int8Calibrator] setup() "
+                            "failure: could not list calibration directory "
+                            "'%s': %s", directory.c_str(), e.what());
+                return RESULT_FAILURE_FILESYSTEM_ERROR;
+            }
+        }
+    }
+
+    if(hasCache)
+    {
+        _logger->logf(LOGGING_INFO, "[Int8Calibrator] Found calibration "
+                    "cache '%s'; calibration images are not required", 
+                    _cacheFilePath.c_str());
+    }
+    else if((int)_files.size() < inputDims.d[0])
+    {
+        _logger->logf(LOGGING_ERROR, "[Int8Calibrator] setup() failure: "
+                    "found %d files in calibration directory, but at least "
+                    "%i are required", (unsigned int)_files.size(), 
+                    inputDims.d[0]);
+        return RESULT_FAILURE_INVALID_INPUT;
+    }
+    else
+    {
+        _logger->logf(LOGGING_INFO, "[Int8Calibrator] Found %d files in "
+                    "calibration directory", (unsigned int)_files.size());
+    }
+
+    if(!_deviceMemory)
+    {
+        auto r = cudaMalloc(&_deviceMemory, 
+                            dimsVolume(inputDims) * sizeof(float));
+        if(r != 0 || _deviceMemory == nullptr)
+        {
+            _logger->logf(LOGGING_ERROR, "[Int8Calibrator] setup() failure: "
+                        "could not allocate device memory: %s", 
+                        cudaGetErrorString(r));
+            return RESULT_FAILURE_CUDA_ERROR;
+        }
+    }
+
+    if(!_preprocessor.setup(inputDims, INPUT_BGR, inputDims.d[0], 
+                            (float*)_deviceMemory))
+    {
+        _logger->log(LOGGING_ERROR, "[Int8Calibrator] setup() failure: could "
+                    "not set up pre-processor");
+        return RESULT_FAILURE_OTHER;
+    }
+    return RESULT_SUCCESS;
+}
+
+int32_t Int8Calibrator::getBatchSize() const noexcept
+{
+    /*  the network has an explicit batch dimension, so every batch simply
+        fills the entire input tensor   */
+    return 1;
+}
+
+bool Int8Calibrator::getBatch(void* bindings[], const char* names[], 
+                    int32_t nbBindings) noexcept
+{
+    YOLOV5_UNUSED(names);
+    if(nbBindings != 1)
+    {
+        _logger->logf(LOGGING_ERROR, "[Int8Calibrator] getBatch() failure: "
+                    "expected a single input, but got %i", nbBindings);
+        return false;
+    }
+
+    const int batchSize = _inputDims.d[0];
+    int index = 0;
+    while(index < batchSize)
+    {
+        if(_nextFile >= _files.size())
+        {
+            /*  not enough images left to fill another batch    */
+            return false;
+        }
+        const std::string& file = _files[_nextFile++];
+
+        cv::Mat image;
+        try
+        {
+            image = cv::imread(file);
+        }
+        catch(const std::exception& e)
+        {
+        }
+        if(image.empty())
+        {
+            _logger->logf(LOGGING_DEBUG, "[Int8Calibrator] getBatch() info: "
+                        "skipping file '%s'", file.c_str());
+            continue;
+        }
+
+        if(!_preprocessor.process(index, image, index == batchSize - 1))
+        {
+            _logger->log(LOGGING_ERROR, "[Int8Calibrator] getBatch() failure: "
+                        "could not pre-process calibration image");
+            return false;
+        }
+        ++index;
+    }
+
+    if(!_preprocessor.synchronizeCudaStream())
+    {
+        return false;
+    }
+    bindings[0] = _deviceMemory;
+    return true;
+}
+
+const void* Int8Calibrator::readCalibrationCache(std::size_t& length) noexcept
+{
+    length = 0;
+    if(_cacheFilePath.length() == 0)
+    {
+        return nullptr;
+    }
+
+    std::ifstream file(_cacheFilePath, std::ios::binary);
+    if(!file.good())
+    {
+        return nullptr;
+    }
+
+    try
+    {
+        _cache.assign(std::istreambuf_iterator<char>(file), 
+                        std::istreambuf_iterator<char>());
+    }
+    catch(const std::exception& e)
+    {
+        _logger->logf(LOGGING_ERROR, "[Int8Calibrator] readCalibrationCache() "
+                    "failure: could not load cache into memory: %s", e.what());
+        return nullptr;
+    }
+    if(_cache.size() == 0)
+    {
+        return nullptr;
+    }
+
+    _logger->logf(LOGGING_INFO, "[Int8Calibrator] Using calibration cache "
+                "'%s'", _cacheFilePath.c_str());
+    length = _cache.size();
+    return _cache.data();
+}
+
+void Int8Calibrator::writeCalibrationCache(const void* ptr, 
+                    std::size_t length) noexcept
+{
+    if(_cacheFilePath.length() == 0)
+    {
+        return;
+    }
+
+    _logger->logf(LOGGING_INFO, "[Int8Calibrator] Writing calibration cache "
+                "to file: %s", _cacheFilePath.c_str());
+
+    std::ofstream file(_cacheFilePath, std::ios::out | std::ios::binary);
+    file.write((const char*)ptr, length);
+    if(!file.good())
+    {
+        _logger->log(LOGGING_ERROR, "[Int8Calibrator] writeCalibrationCache() "
+                    "failure: error encountered writing to cache file");
+    }
+}
+
+
+}   /*  namespace internal  */
+
+}   /*  namespace yolov5    */
@@ -121,6 +121,10 @@ const char* precision_to_string(Precision p) noexcept
     {
         return "fp16";
     }
+    else if(p == PRECISION_INT8)
+    {
+        return "int8";
+    }
     else
     {
         return "";
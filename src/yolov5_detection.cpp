@@ -30,10 +30,75 @@
 #include "yolov5_detection.hpp"
 
 #include <fstream>
+#include <map>
 
 namespace yolov5
 {
 
+/*  Text rendered once into a mask, such that it can be drawn repeatedly
+    through a masked copy instead of rasterizing the text again  */
+struct RenderedText
+{
+    cv::Mat         mask;       /*  text in white on black, CV_8UC1     */
+    cv::Point       origin;     /*  text origin (bottom-left) in mask   */
+    int             advance;    /*  horizontal advance of the text      */
+};
+
+static const RenderedText& renderText(const std::string& text, 
+                        const int& fontFace, const double& fontScale,
+                        const int& thickness)
+{
+    /*  The labels are made up of the class name and the score, which are
+        cached separately: this way there is one entry per class and at most
+        101 entries for the scores (0.00 - 1.00), such that the cache stays
+        small and every label is drawn from it after the first few frames.
+        The cache is thread-local, such that visualization remains
+        thread-safe. The size limit only guards against an unbounded number
+        of distinct class names  */
+    thread_local std::map<std::string, RenderedText> cache;
+    thread_local double cacheFontScale = 0;
+    if(fontScale != cacheFontScale || cache.size() >= 4096)
+    {
+        cache.clear();
+        cacheFontScale = fontScale;
+    }
+
+    const auto it = cache.find(text);
+    if(it != cache.end())
+    {
+        return it->second;
+    }
+
+    /*  note: some glyphs extend slightly beyond the text size, so a
+        margin is added around the text   */
+    int baseline = 0;
+    const cv::Size textSize = cv::getTextSize(text, fontFace, fontScale,
+                                                thickness, &baseline);
+    const int margin = thickness + 1;
+
+    RenderedText rendered;
+    rendered.origin = cv::Point(margin, margin + textSize.height);
+    rendered.mask = cv::Mat::zeros(rendered.origin.y + baseline + margin,
+                                    textSize.width + 2 * margin, CV_8UC1);
+    rendered.advance = textSize.width - thickness;  /*  see getTextSize() */
+    cv::putText(rendered.mask, text, rendered.origin, fontFace, fontScale,
+                    cv::Scalar(255), thickness);
+    return cache.emplace(text, rendered).first->second;
+}
+
+static void drawRenderedText(const RenderedText& text, const cv::Point& org,
+                        const cv::Scalar& color, cv::Mat* image)
+{
+    /*  only the part that falls within the image is drawn  */
+    const cv::Rect textRect(org - text.origin, text.mask.size());
+    const cv::Rect visible = textRect & cv::Rect(0, 0, image->cols, 
+                                                image->rows);
+    if(!visible.empty())
+    {
+        (*image)(visible).setTo(color, text.mask(visible - textRect.tl()));
+    }
+}
+
 Detection::Detection() noexcept : _classId(-1), _score(0)
 {
 }
@@ -111,7 +176,9 @@ Result visualizeDetection(const Detection& detection, cv::Mat* image,
         }
         std::stringstream ss;
         ss << std::fixed << std::setprecision(2) << detection.score();
-        const std::string label = className + ": " + ss.str();
+        const std::string prefix = className + ": ";
+        const std::string score = ss.str();
+        const std::string label = prefix + score;
 
         /*  Draw a rectangle above the bounding box, in which the
             label will be written   */
@@ -125,10 +192,23 @@ Result visualizeDetection(const Detection& detection, cv::Mat* image,
         const cv::Rect labelRect(tl, textSize);
         cv::rectangle(*image, labelRect, color, -1);  /*  filled rectangle */
 
-        /*  white text on top of the previously drawn rectangle */
+        /*  white text on top of the previously drawn rectangle. The class
+            name and the score are rendered once, and afterwards copied from
+            the cache. The score is placed at the advance of the class name,
+            as cv::putText() would do (up to rounding to whole pixels).
+            
+            note: each part is drawn before the next is looked up, since a
+            lookup may clear the cache   */
         const cv::Point bl(tl.x, bbox.y - bboxThickness/2.0);
-        cv::putText(*image, label, bl, cv::FONT_HERSHEY_PLAIN,
-                        fontScale, cv::Scalar(255, 255, 255), textThickness);
+        const cv::Scalar white(255, 255, 255);
+        const RenderedText& prefixText = renderText(prefix, 
+                        cv::FONT_HERSHEY_PLAIN, fontScale, textThickness);
+        drawRenderedText(prefixText, bl, white, image);
+        const cv::Point scoreOrigin(bl.x + prefixText.advance, bl.y);
+
+        const RenderedText& scoreText = renderText(score, 
+                        cv::FONT_HERSHEY_PLAIN, fontScale, textThickness);
+        drawRenderedText(scoreText, scoreOrigin, white, image);
     }
     catch(const std::exception& e)
     {
@@ -137,6 +217,22 @@ Result visualizeDetection(const Detection& detection, cv::Mat* image,
     return RESULT_SUCCESS;
 }
 
+Result visualizeDetections(const std::vector<Detection>& detections, 
+                            cv::Mat* image, const cv::Scalar& color, 
+                            const double& fontScale) noexcept
+{
+    for(unsigned int i = 0; i < detections.size(); ++i)
+    {
+        const Result r = visualizeDetection(detections[i], image, color, 
+                                            fontScale);
+        if(r != RESULT_SUCCESS)
+        {
+            return r;
+        }
+    }
+    return RESULT_SUCCESS;
+}
+
 Classes::Classes() noexcept
 {
 }
@@ -43,7 +43,8 @@ namespace yolov5
 {
 
 Detector::Detector() noexcept 
-    : _initialized(false), _scoreThreshold(0.4), _nmsThreshold(0.4)
+    : _initialized(false), _scoreThreshold(0.4), _nmsThreshold(0.4),
+    _useCudaGraph(false), _warmedUp(false)
 {
 }
 
@@ -89,11 +90,14 @@ Result Detector::init(int flags) noexcept
         {
             const bool cvCudaAvailable = internal::opencvHasCuda();
 
-            if((flags & PREPROCESSOR_CVCUDA) && (flags & PREPROCESSOR_CVCPU))
+            const int numPreprocessorFlags = 
+                            (int)((flags & PREPROCESSOR_CVCUDA) != 0) + 
+                            (int)((flags & PREPROCESSOR_CVCPU) != 0) +
+                            (int)((flags & PREPROCESSOR_CUDA) != 0);
+            if(numPreprocessorFlags > 1)
             {
                 _logger->log(LOGGING_ERROR, "[Detector] init() failure: "
-                            "both PREPROCESSOR_CVCUDA and PREPROCESSOR_CVCPU "
-                            "flags specified");
+                            "multiple PREPROCESSOR_* flags specified");
                 return RESULT_FAILURE_INVALID_INPUT;
             }
             
@@ -113,7 +117,14 @@ Result Detector::init(int flags) noexcept
                 useCudaPreprocessor = false;
             }
 
-            if(useCudaPreprocessor)
+            if(flags & PREPROCESSOR_CUDA)
+            {
+                _logger->log(LOGGING_INFO, "[Detector] Using CUDA "
+                            "pre-processor");
+                _preprocessor = 
+                        std::make_unique<internal::CudaPreprocessor>();
+            }
+            else if(useCudaPreprocessor)
             {
                 _logger->log(LOGGING_INFO, "[Detector] Using OpenCV-CUDA "
                             "pre-processor");
@@ -153,6 +164,13 @@ Result Detector::init(int flags) noexcept
     }
 
 
+    _useCudaGraph = (flags & USE_CUDA_GRAPH);
+    if(_useCudaGraph)
+    {
+        _logger->log(LOGGING_INFO, "[Detector] Using CUDA graphs for "
+                    "inference");
+    }
+
     _initialized = true;
     return RESULT_SUCCESS;
 }
@@ -586,10 +604,30 @@ Result Detector::_loadEngine(const std::vector<char>& data) noexcept
         return RESULT_FAILURE_MODEL_ERROR;
     }
     if(input.isDynamic())
+    {
+        /*  Use the optimal dimensions of the (first) optimization profile,
+            which is what the engine was tuned for   */
+        const nvinfer1::Dims optDims = engine->getProfileDimensions(
+                input.index(), 0, nvinfer1::OptProfileSelector::kOPT);
+        if(!executionContext->setBindingDimensions(input.index(), optDims))
+        {
+            _logger->log(LOGGING_ERROR, "[Detector] loadEngine() failure: "
+                        "could not set input dimensions for engine with "
+                        "dynamic input dimensions");
+            return RESULT_FAILURE_TENSORRT_ERROR;
+        }
+        input.setDims(optDims);
+
+        std::string str;
+        internal::dimsToString(optDims, &str);
+        _logger->logf(LOGGING_INFO, "[Detector] loadEngine() info: input "
+                    "binding has dynamic dimensions; using optimization "
+                    "profile dimensions %s", str.c_str());
+    }
+    if(input.isDynamic())
     {
         _logger->log(LOGGING_ERROR, "[Detector] loadEngine() failure: "
-                    "input binding has dynamic dimensions. This is not "
-                    "supported at this time!");
+                    "could not determine the input dimensions");
         return RESULT_FAILURE_MODEL_ERROR;
     }
 
@@ -602,6 +640,9 @@ Result Detector::_loadEngine(const std::vector<char>& data) noexcept
                     "not set up output binding");
         return RESULT_FAILURE_MODEL_ERROR;
     }
+    /*  for dynamic engines, the output dimensions follow from the input
+        dimensions that were set on the execution context   */
+    output.setDims(executionContext->getBindingDimensions(output.index()));
     if(output.dims().nbDims != 3)
     {
         std::string str;
@@ -620,7 +661,8 @@ Result Detector::_loadEngine(const std::vector<char>& data) noexcept
 
     /*  Set up Device memory for input & output */
     internal::DeviceMemory memory;
-    const Result r = internal::DeviceMemory::setup(_logger, engine, &memory);
+    const Result r = internal::DeviceMemory::setup(_logger, engine, 
+                                            executionContext, &memory);
     if(r != RESULT_SUCCESS)
     {
         _logger->log(LOGGING_ERROR, "[Detector] loadEngine() failure: "
@@ -628,17 +670,15 @@ Result Detector::_loadEngine(const std::vector<char>& data) noexcept
         return r;
     }
 
-    /*  Set up memory on host for post-processing */
-    std::vector<float> outputHostMemory;
-    try
-    {
-        outputHostMemory.resize(output.volume());
-    }
-    catch(const std::exception& e)
+    /*  Set up (pinned) memory on host for post-processing */
+    internal::HostMemory outputHostMemory;
+    const Result rh = internal::HostMemory::setup(_logger, output.volume(),
+                                                &outputHostMemory);
+    if(rh != RESULT_SUCCESS)
     {
-        _logger->logf(LOGGING_ERROR, "[Detector] loadEngine() failure: "
-                    "could not set up output host memory: %s", e.what());
-        return RESULT_FAILURE_ALLOC;
+        _logger->log(LOGGING_ERROR, "[Detector] loadEngine() failure: "
+                    "could not set up output host memory");
+        return rh;
     }
 
 
@@ -663,6 +703,11 @@ Result Detector::_loadEngine(const std::vector<char>& data) noexcept
         method of unique_ptr (!)    */
     _preprocessor->reset();
 
+    /*  the CUDA graph refers to the memory of the old engine, and thus has
+        to be captured again   */
+    _cudaGraph.reset();
+    _warmedUp = false;
+
     _logger->log(LOGGING_INFO, "[Detector] Successfully loaded inference "
                 "engine");
     return RESULT_SUCCESS;
@@ -763,10 +808,81 @@ Result Detector::_detectBatch(const int& nrImages,
 }
 
 Result Detector::_inference(const char* logid)
+{
+    cudaStream_t stream = _preprocessor->cudaStream();
+
+    if(_useCudaGraph && _cudaGraph.isCaptured())
+    {
+        /*  Replay the captured inference   */
+        if(_cudaGraph.launch(_logger, stream) != RESULT_SUCCESS)
+        {
+            _logger->logf(LOGGING_ERROR, "[Detector] %s failure: could not "
+                        "launch CUDA graph", logid);
+            return RESULT_FAILURE_CUDA_ERROR;
+        }
+    }
+    else if(_useCudaGraph && _warmedUp)
+    {
+        /*  Capture the inference into a CUDA graph. Note that the first run
+            is performed without capturing, such that TensorRT can perform
+            any lazy initialization    */
+        bool captured = false;
+        if(_cudaGraph.beginCapture(_logger, stream) == RESULT_SUCCESS)
+        {
+            const Result r = _enqueue(logid, stream);
+            captured = (_cudaGraph.endCapture(_logger, stream) 
+                            == RESULT_SUCCESS) && (r == RESULT_SUCCESS);
+        }
+
+        if(captured)
+        {
+            _logger->log(LOGGING_INFO, "[Detector] Captured inference into "
+                        "CUDA graph");
+            if(_cudaGraph.launch(_logger, stream) != RESULT_SUCCESS)
+            {
+                _logger->logf(LOGGING_ERROR, "[Detector] %s failure: could "
+                            "not launch CUDA graph", logid);
+                return RESULT_FAILURE_CUDA_ERROR;
+            }
+        }
+        else
+        {
+            _logger->log(LOGGING_WARNING, "[Detector] could not capture "
+                        "inference into CUDA graph; falling back to regular "
+                        "execution");
+            _cudaGraph.reset();
+            _useCudaGraph = false;
+
+            const Result r = _enqueue(logid, stream);
+            if(r != RESULT_SUCCESS)
+            {
+                return r;
+            }
+        }
+    }
+    else
+    {
+        const Result r = _enqueue(logid, stream);
+        if(r != RESULT_SUCCESS)
+        {
+            return r;
+        }
+        _warmedUp = true;
+    }
+
+    /*  Synchronize */
+    if(!_preprocessor->synchronizeCudaStream())
+    {
+        return RESULT_FAILURE_CUDA_ERROR;
+    }
+    return RESULT_SUCCESS;
+}
+
+Result Detector::_enqueue(const char* logid, cudaStream_t stream)
 {
     /*  Enqueue for inference   */
-    if(!_trtExecutionContext->enqueueV2(_deviceMemory.begin(),
-                                        _preprocessor->cudaStream(), nullptr))
+    if(!_trtExecutionContext->enqueueV2(_deviceMemory.begin(), stream, 
+                                        nullptr))
     {
         _logger->logf(LOGGING_ERROR, "[Detector] %s failure: could not enqueue "
                     "data for inference", logid);
@@ -777,7 +893,7 @@ Result Detector::_inference(const char* logid)
     auto r = cudaMemcpyAsync(_outputHostMemory.data(), 
             _deviceMemory.at(_outputBinding.index()),
             (int)(_outputBinding.volume() * sizeof(float)), 
-            cudaMemcpyDeviceToHost, _preprocessor->cudaStream());
+            cudaMemcpyDeviceToHost, stream);
     if(r != 0)
     {
         _logger->logf(LOGGING_ERROR, "[Detector] %s failure: could not set up "
@@ -785,12 +901,6 @@ Result Detector::_inference(const char* logid)
                     logid, cudaGetErrorString(r));
         return RESULT_FAILURE_CUDA_ERROR;
     }
-
-    /*  Synchronize */
-    if(!_preprocessor->synchronizeCudaStream())
-    {
-        return RESULT_FAILURE_CUDA_ERROR;
-    }
     return RESULT_SUCCESS;
 }
 
@@ -216,6 +216,12 @@ bool EngineBinding::setup(const std::unique_ptr<nvinfer1::ICudaEngine>& engine,
     return true;
 }
 
+void EngineBinding::setDims(const nvinfer1::Dims& dims) noexcept
+{
+    _dims = dims;
+    _volume = dimsVolume(_dims);
+}
+
 DeviceMemory::DeviceMemory() noexcept
 {
 }
@@ -249,12 +255,13 @@ void* DeviceMemory::at(const int& index) const noexcept
 
 Result DeviceMemory::setup(const std::shared_ptr<Logger>& logger, 
                     std::unique_ptr<nvinfer1::ICudaEngine>& engine,
+                    std::unique_ptr<nvinfer1::IExecutionContext>& context,
                     DeviceMemory* output) noexcept
 {
     const int32_t nbBindings = engine->getNbBindings();
     for(int i = 0; i < nbBindings; ++i)
     {
-        const nvinfer1::Dims dims = engine->getBindingDimensions(i); 
+        const nvinfer1::Dims dims = context->getBindingDimensions(i); 
         const int volume = dimsVolume(dims);
 
         try
@@ -282,6 +289,137 @@ Result DeviceMemory::setup(const std::shared_ptr<Logger>& logger,
     return RESULT_SUCCESS;
 }
 
+HostMemory::HostMemory() noexcept : _memory(nullptr), _size(0)
+{
+}
+
+HostMemory::~HostMemory() noexcept
+{
+    if(_memory)
+    {
+        cudaFreeHost(_memory);
+    }
+    _memory = nullptr;
+}
+
+void HostMemory::swap(HostMemory& other) noexcept
+{
+    std::swap(_memory, other._memory);
+    std::swap(_size, other._size);
+}
+
+float* HostMemory::data() const noexcept
+{
+    return _memory;
+}
+
+const int& HostMemory::size() const noexcept
+{
+    return _size;
+}
+
+Result HostMemory::setup(const std::shared_ptr<Logger>& logger, 
+                    const int& size, HostMemory* output) noexcept
+{
+    void* ptr = nullptr;
+    auto r = cudaMallocHost(&ptr, size * sizeof(float));
+    if(r != 0 || ptr == nullptr)
+    {
+        logger->logf(LOGGING_ERROR, "[HostMemory] setup() failure: "
+                    "could not allocate pinned host memory: %s", 
+                    cudaGetErrorString(r));
+        return RESULT_FAILURE_CUDA_ERROR;
+    }
+
+    if(output->_memory)
+    {
+        cudaFreeHost(output->_memory);
+    }
+    output->_memory = (float*)ptr;
+    output->_size = size;
+    return RESULT_SUCCESS;
+}
+
+CudaGraph::CudaGraph() noexcept : _graph(nullptr), _graphExec(nullptr)
+{
+}
+
+CudaGraph::~CudaGraph() noexcept
+{
+    reset();
+}
+
+bool CudaGraph::isCaptured() const noexcept
+{
+    return (_graphExec != nullptr);
+}
+
+void CudaGraph::reset() noexcept
+{
+    if(_graphExec)
+    {
+        cudaGraphExecDestroy(_graphExec);
+        _graphExec = nullptr;
+    }
+    if(_graph)
+    {
+        cudaGraphDestroy(_graph);
+        _graph = nullptr;
+    }
+}
+
+Result CudaGraph::beginCapture(const std::shared_ptr<Logger>& logger,
+                    cudaStream_t stream) noexcept
+{
+    reset();
+
+    auto r = cudaStreamBeginCapture(stream, cudaStreamCaptureModeThreadLocal);
+    if(r != 0)
+    {
+        logger->logf(LOGGING_ERROR, "[CudaGraph] beginCapture() failure: %s",
+                    cudaGetErrorString(r));
+        return RESULT_FAILURE_CUDA_ERROR;
+    }
+    return RESULT_SUCCESS;
+}
+
+Result CudaGraph::endCapture(const std::shared_ptr<Logger>& logger,
+                    cudaStream_t stream) noexcept
+{
+    auto r = cudaStreamEndCapture(stream, &_graph);
+    if(r != 0 || _graph == nullptr)
+    {
+        logger->logf(LOGGING_ERROR, "[CudaGraph] endCapture() failure: %s",
+                    cudaGetErrorString(r));
+        reset();
+        return RESULT_FAILURE_CUDA_ERROR;
+    }
+
+    r = cudaGraphInstantiate(&_graphExec, _graph, nullptr, nullptr, 0);
+    if(r != 0)
+    {
+        logger->logf(LOGGING_ERROR, "[CudaGraph] endCapture() failure: could "
+                    "not instantiate graph: %s", cudaGetErrorString(r));
+        _graphExec = nullptr;
+        reset();
+        return RESULT_FAILURE_CUDA_ERROR;
+    }
+    return RESULT_SUCCESS;
+}
+
+Result CudaGraph::launch(const std::shared_ptr<Logger>& logger,
+                    cudaStream_t stream) noexcept
+{
+    auto r = cudaGraphLaunch(_graphExec, stream);
+    if(r != 0)
+    {
+        logger->logf(LOGGING_ERROR, "[CudaGraph] launch() failure: %s",
+                    cudaGetErrorString(r));
+        return RESULT_FAILURE_CUDA_ERROR;
+    }
+    return RESULT_SUCCESS;
+}
+
 bool opencvHasCuda() noexcept
 {
     int r = 0;
@@ -480,12 +618,23 @@ bool CvCpuPreprocessor::setup(const nvinfer1::Dims& inputDims,
 
     _deviceInputMemory = inputMemory;
 
+    /*  Set up (pinned) host input memory    */
+    const int volume = dimsVolume(inputDims);
+    if(_hostInputMemory.size() != volume)
+    {
+        if(HostMemory::setup(_logger, volume, &_hostInputMemory) 
+                != RESULT_SUCCESS)
+        {
+            _logger->log(LOGGING_ERROR, "[CvCpuPreprocessor] setup() "
+                        "failure: could not set up host input memory");
+            _lastType = (InputType)-1;
+            return false;
+        }
+    }
+
     _inputChannels.clear();
     try
     {
-        /*  Set up host input memory    */
-        _hostInputMemory.resize(dimsVolume(inputDims));
-
         _inputChannels.resize(batchSize);
         for(unsigned int i = 0; i < _inputChannels.size(); ++i)
         {
@@ -614,6 +763,258 @@ bool CvCpuPreprocessor::synchronizeCudaStream() noexcept
     return true;
 }
 
+CudaPreprocessor::CudaPreprocessor() noexcept 
+    : _cudaStream(nullptr), _lastType((InputType)-1), _lastBatchSize(-1), 
+    _networkCols(0), _networkRows(0), _deviceInputMemory(nullptr),
+    _deviceBuffer(nullptr), _deviceBufferSize(0)
+{
+}
+
+CudaPreprocessor::~CudaPreprocessor() noexcept
+{
+    for(unsigned int i = 0; i < _hostBuffers.size(); ++i)
+    {
+        if(_hostBuffers[i])
+        {
+            cudaFreeHost(_hostBuffers[i]);
+        }
+    }
+    if(_deviceBuffer)
+    {
+        cudaFree(_deviceBuffer);
+    }
+    if(_cudaStream)
+    {
+        cudaStreamDestroy(_cudaStream);
+    }
+}
+
+bool CudaPreprocessor::setup(const nvinfer1::Dims& inputDims,
+                            const int& flags, const int& batchSize,
+                            float* inputMemory) noexcept
+{
+    if(!_cudaStream)
+    {
+        auto r = cudaStreamCreate(&_cudaStream);
+        if(r != 0)
+        {
+            _logger->logf(LOGGING_ERROR, "[CudaPreprocessor] setup() "
+                        "failure: could not create cuda stream: %s", 
+                        cudaGetErrorString(r));
+            return false;
+        }
+    }
+
+    if((flags & INPUT_RGB) && (flags & INPUT_BGR))
+    {
+        _logger->log(LOGGING_ERROR, "[CudaPreprocessor] setup() "
+                    "failure: both INPUT_RGB and INPUT_BGR flags specified"); 
+        return false;
+    }
+    InputType inputType = INPUTTYPE_BGR;
+    if(flags & INPUT_RGB)
+    {
+        inputType = INPUTTYPE_RGB;
+    }
+
+    if(_lastType == inputType && _lastBatchSize == batchSize)
+    {
+        return true;
+    }
+    /*  one staging buffer per image in the batch. These are allocated on
+        first use, and kept when the batch size decreases   */
+    if((int)_hostBuffers.size() < batchSize)
+    {
+        try
+        {
+            _hostBuffers.resize(batchSize, nullptr);
+            _hostBufferSizes.resize(batchSize, 0);
+        }
+        catch(const std::exception& e)
+        {
+            _logger->logf(LOGGING_ERROR, "[CudaPreprocessor] setup() "
+                        "failure: could not set up staging buffers: %s", 
+                        e.what());
+            return false;
+        }
+    }
+
+    _lastType = inputType;
+    _lastBatchSize = batchSize;
+
+    _networkRows = inputDims.d[2];
+    _networkCols = inputDims.d[3];
+
+    _deviceInputMemory = inputMemory;
+    return true;
+}
+
+void CudaPreprocessor::reset() noexcept
+{
+    /*  this will trigger setup() to take effect next time  */
+    _lastType = (InputType)-1;
+}
+
+bool CudaPreprocessor::process(const int& index, 
+                                const cv::Mat& input,
+                                const bool& last) noexcept
+{
+    if(input.type() != CV_8UC3)
+    {
+        _logger->log(LOGGING_ERROR, "[CudaPreprocessor] process() failure: "
+                    "only 8-bit, 3-channel inputs are supported");
+        return false;
+    }
+
+    if(index < 0 || index >= (int)_hostBuffers.size())
+    {
+        _logger->logf(LOGGING_ERROR, "[CudaPreprocessor] process() failure: "
+                    "invalid index %i", index);
+        return false;
+    }
+
+    /*  Set up the staging buffers. Note that the host buffer of this index
+        is not in use by any other image of the batch, while freeing the
+        device buffer implicitly synchronizes    */
+    const size_t rowSize = input.cols * input.elemSize();
+    const size_t size = rowSize * input.rows;
+    unsigned char*& hostBuffer = _hostBuffers[index];
+    if(size > _hostBufferSizes[index])
+    {
+        if(hostBuffer)
+        {
+            cudaFreeHost(hostBuffer);
+            hostBuffer = nullptr;
+            _hostBufferSizes[index] = 0;
+        }
+        auto r = cudaMallocHost((void**)&hostBuffer, size);
+        if(r != 0 || hostBuffer == nullptr)
+        {
+            _logger->logf(LOGGING_ERROR, "[CudaPreprocessor] process() "
+                        "failure: could not allocate pinned host memory: %s",
+                        cudaGetErrorString(r));
+            hostBuffer = nullptr;
+            return false;
+        }
+        _hostBufferSizes[index] = size;
+    }
+    if(size > _deviceBufferSize)
+    {
+        if(_deviceBuffer)
+        {
+            cudaFree(_deviceBuffer);
+            _deviceBuffer = nullptr;
+            _deviceBufferSize = 0;
+        }
+        auto r = cudaMalloc((void**)&_deviceBuffer, size);
+        if(r != 0 || _deviceBuffer == nullptr)
+        {
+            _logger->logf(LOGGING_ERROR, "[CudaPreprocessor] process() "
+                        "failure: could not allocate device memory: %s",
+                        cudaGetErrorString(r));
+            return false;
+        }
+        _deviceBufferSize = size;
+    }
+
+    /*  Stage the raw (8-bit) input in pinned memory, and upload it */
+    try
+    {
+        cv::Mat staged(input.rows, input.cols, input.type(), hostBuffer);
+        input.copyTo(staged);
+    }
+    catch(const std::exception& e)
+    {
+        _logger->logf(LOGGING_ERROR, "[CudaPreprocessor] process() "
+                            "failure: got exception staging input: %s", 
+                            e.what());
+        return false;
+    }
+
+    auto r = cudaMemcpyAsync(_deviceBuffer, hostBuffer, size, 
+                            cudaMemcpyHostToDevice, _cudaStream);
+    if(r != 0)
+    {
+        _logger->logf(LOGGING_ERROR, "[CudaPreprocessor] process() "
+                    "failure: could not set up host-to-device transfer "
+                    "for input: %s", cudaGetErrorString(r));
+        return false;
+    }
+
+    if(!Preprocessor::process(index, input, last))
+    {
+        return false;
+    }
+    return _process(index, _deviceBuffer, rowSize, input.size());
+}
+
+bool CudaPreprocessor::process(const int& index, 
+                                const cv::cuda::GpuMat& input,
+                                const bool& last) noexcept
+{
+    if(input.type() != CV_8UC3)
+    {
+        _logger->log(LOGGING_ERROR, "[CudaPreprocessor] process() failure: "
+                    "only 8-bit, 3-channel inputs are supported");
+        return false;
+    }
+
+    if(!Preprocessor::process(index, input, last))
+    {
+        return false;
+    }
+    return _process(index, input.ptr<unsigned char>(), input.step, 
+                    input.size());
+}
+
+cudaStream_t CudaPreprocessor::cudaStream() const noexcept
+{
+    return _cudaStream;
+}
+
+bool CudaPreprocessor::synchronizeCudaStream() noexcept
+{
+    auto r = cudaStreamSynchronize(_cudaStream); 
+    if(r != 0)
+    {
+        _logger->logf(LOGGING_ERROR, "[CudaPreprocessor] "
+                "synchronizeCudaStream() failure: %s", cudaGetErrorString(r));
+        return false;
+    }
+    return true;
+}
+
+bool CudaPreprocessor::_process(const int& index, const unsigned char* input,
+                    const size_t& step, const cv::Size& size) noexcept
+{
+    /*  Determine the letterbox parameters, in the same way as the other
+        pre-processors   */
+    const double f = MIN((double)_networkRows / (double)size.height,
+                        (double)_networkCols / (double)size.width);
+    const cv::Size boxSize = cv::Size(size.width * f, size.height * f);
+
+    const int dr = _networkRows - boxSize.height;
+    const int dc = _networkCols - boxSize.width;
+    const int topHeight = std::floor(dr / 2.0);
+    const int leftWidth = std::floor(dc / 2.0);
+
+    _transforms[index] = PreprocessorTransform(size, f, leftWidth, topHeight);
+
+    float* output = _deviceInputMemory + index * _networkRows * _networkCols * 3;
+    auto r = launchLetterboxKernel(input, step, size.width, size.height,
+                    output, _networkCols, _networkRows, 
+                    boxSize.width, boxSize.height, leftWidth, topHeight,
+                    _lastType == INPUTTYPE_BGR, _cudaStream);
+    if(r != 0)
+    {
+        _logger->logf(LOGGING_ERROR, "[CudaPreprocessor] process() "
+                    "failure: could not launch pre-processing kernel: %s", 
+                    cudaGetErrorString(r));
+        return false;
+    }
+    return true;
+}
+
 CvCudaPreprocessor::CvCudaPreprocessor() noexcept 
     : _lastType((InputType)-1), _lastBatchSize(-1), 
     _networkCols(0), _networkRows(0)
@@ -694,9 +1095,26 @@ bool CvCudaPreprocessor::process(const int& index,
                         const cv::Mat& input, const bool& last) noexcept
 {
 #ifdef YOLOV5_OPENCV_HAS_CUDA
+    if(index >= 1)
+    {
+        /*  The staging buffer might still be in use by the upload of the 
+            previous image in the batch    */
+        if(!synchronizeCudaStream())
+        {
+            return false;
+        }
+    }
+
     try
     {
-        _buffer0.upload(input);
+        /*  Stage the input in pinned memory, such that it can be uploaded 
+            asynchronously. Note that the buffer is only reallocated if
+            the input size changes  */
+        _hostBuffer.create(input.rows, input.cols, input.type());
+        cv::Mat staged = _hostBuffer.createMatHeader();
+        input.copyTo(staged);
+
+        _buffer0.upload(_hostBuffer, _cudaStream);
     }
     catch(const std::exception& e)
     {
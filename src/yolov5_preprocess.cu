@@ -0,0 +1,135 @@
+/**
+ * @file
+ * 
+ * @author      Noah van der Meer
+ * @brief       YoloV5 inference through TensorRT (CUDA pre-processing kernel)
+ * 
+ * 
+ * Copyright (c) 2021, Noah van der Meer
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy
+ * of this software and associated documentation files (the "Software"), to 
+ * deal in the Software without restriction, including without limitation the
+ * rights to use, copy, modify, merge, publish, distribute, sublicense, and/or 
+ * sell copies of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in 
+ * all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+ * AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+ * LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+ * FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+ * IN THE SOFTWARE.
+ * 
+ */
+
+/*  note: this file is compiled by nvcc, and therefore intentionally does
+        not include the TensorRT/OpenCV based headers of the library   */
+#include <cuda_runtime.h>
+
+namespace yolov5
+{
+
+namespace internal
+{
+
+/*  One thread per pixel of the network input   */
+__global__ void letterboxKernel(const unsigned char* input, size_t inputStep,
+                    int inputCols, int inputRows, float* output, 
+                    int networkCols, int networkRows, int boxCols, int boxRows,
+                    int leftWidth, int topHeight, float scaleX, float scaleY,
+                    bool swapRB)
+{
+    const int x = blockIdx.x * blockDim.x + threadIdx.x;
+    const int y = blockIdx.y * blockDim.y + threadIdx.y;
+    if(x >= networkCols || y >= networkRows)
+    {
+        return;
+    }
+
+    float c0 = 0.0f;
+    float c1 = 0.0f;
+    float c2 = 0.0f;
+
+    const int bx = x - leftWidth;
+    const int by = y - topHeight;
+    if(bx >= 0 && bx < boxCols && by >= 0 && by < boxRows)
+    {
+        /*  bilinear sampling, using the same pixel-center convention as
+            cv::resize(..., cv::INTER_LINEAR)  */
+        const float sx = fmaxf((bx + 0.5f) * scaleX - 0.5f, 0.0f);
+        const float sy = fmaxf((by + 0.5f) * scaleY - 0.5f, 0.0f);
+
+        const int x0 = min((int)sx, inputCols - 1);
+        const int y0 = min((int)sy, inputRows - 1);
+        const int x1 = min(x0 + 1, inputCols - 1);
+        const int y1 = min(y0 + 1, inputRows - 1);
+
+        const float ax = sx - x0;
+        const float ay = sy - y0;
+
+        const unsigned char* r0 = input + y0 * inputStep;
+        const unsigned char* r1 = input + y1 * inputStep;
+
+        const float w00 = (1.0f - ax) * (1.0f - ay);
+        const float w01 = ax * (1.0f - ay);
+        const float w10 = (1.0f - ax) * ay;
+        const float w11 = ax * ay;
+
+        c0 = w00 * r0[3*x0] + w01 * r0[3*x1] + w10 * r1[3*x0] + w11 * r1[3*x1];
+        c1 = w00 * r0[3*x0+1] + w01 * r0[3*x1+1] 
+                + w10 * r1[3*x0+1] + w11 * r1[3*x1+1];
+        c2 = w00 * r0[3*x0+2] + w01 * r0[3*x1+2] 
+                + w10 * r1[3*x0+2] + w11 * r1[3*x1+2];
+    }
+
+    /*  the network expects planar RGB in [0, 1]  */
+    const int area = networkCols * networkRows;
+    float* out = output + y * networkCols + x;
+    const float s = 1.0f / 255.0f;
+    if(swapRB)
+    {
+        out[0] = c2 * s;
+        out[area] = c1 * s;
+        out[2 * area] = c0 * s;
+    }
+    else
+    {
+        out[0] = c0 * s;
+        out[area] = c1 * s;
+        out[2 * area] = c2 * s;
+    }
+}
+
+cudaError_t launchLetterboxKernel(const unsigned char* input, 
+                    const size_t& inputStep, const int& inputCols, 
+                    const int& inputRows, float* output, 
+                    const int& networkCols, const int& networkRows,
+                    const int& boxCols, const int& boxRows,
+                    const int& leftWidth, const int& topHeight,
+                    const bool& swapRB, cudaStream_t stream) noexcept
+{
+    if(boxCols <= 0 || boxRows <= 0)
+    {
+        return cudaErrorInvalidValue;
+    }
+    const float scaleX = (float)inputCols / (float)boxCols;
+    const float scaleY = (float)inputRows / (float)boxRows;
+
+    const dim3 block(32, 8);
+    const dim3 grid((networkCols + block.x - 1) / block.x, 
+                    (networkRows + block.y - 1) / block.y);
+    letterboxKernel<<<grid, block, 0, stream>>>(input, inputStep, 
+                    inputCols, inputRows, output, networkCols, networkRows, 
+                    boxCols, boxRows, leftWidth, topHeight, scaleX, scaleY,
+                    swapRB);
+    return cudaGetLastError();
+}
+
+}   /*  namespace internal  */
+
+}   /*  namespace yolov5    */